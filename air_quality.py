@@ -0,0 +1,20 @@
+"""Air quality classification shared by the dashboard server and sensor readers"""
+
+# Upper PM2.5 limit (µg/m³) of each level below Hazardous
+AQI_BOUNDARIES = (12, 35, 55, 150, 250)
+
+
+def get_air_quality_level(pm25):
+    """Get air quality level based on PM2.5"""
+    if pm25 <= 12:
+        return {'level': 'Good', 'color': '#00e400', 'description': 'Air quality is satisfactory'}
+    elif pm25 <= 35:
+        return {'level': 'Moderate', 'color': '#ffff00', 'description': 'Air quality is acceptable'}
+    elif pm25 <= 55:
+        return {'level': 'Unhealthy for Sensitive Groups', 'color': '#ff7e00', 'description': 'Sensitive groups may experience health effects'}
+    elif pm25 <= 150:
+        return {'level': 'Unhealthy', 'color': '#ff0000', 'description': 'Everyone may begin to experience health effects'}
+    elif pm25 <= 250:
+        return {'level': 'Very Unhealthy', 'color': '#8f3f97', 'description': 'Health alert: everyone may experience serious effects'}
+    else:
+        return {'level': 'Hazardous', 'color': '#7e0023', 'description': 'Health warnings of emergency conditions'}
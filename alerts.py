@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Streaming alert engine for AirIQ sensor readings
+Every sample is pushed through a set of rules as it arrives. Each rule keeps
+running window statistics, so evaluation is O(1) per sample and never
+touches the database.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class Rule:
+    """
+    Base class for alert rules
+
+    Subclasses implement check(), which returns True when the alert
+    condition holds, False when it has clearly ended, and None while the
+    value sits in the hysteresis band (state unchanged). The state only
+    flips after `debounce` consecutive samples agree.
+    """
+
+    kind = 'rule'
+
+    def __init__(self, name, channel, debounce=1, message=''):
+        """
+        Args:
+            name: Unique alert name
+            channel: Sample key the rule watches (e.g. 'pm25', 'co2')
+            debounce: Consecutive samples needed to raise or clear
+            message: Human readable description for the API
+        """
+        self.name = name
+        self.channel = channel
+        self.debounce = debounce
+        self.message = message
+        self.active = False
+        self.since = None
+        self.value = None
+        self._streak = 0
+
+    def check(self, t, value):
+        """Evaluate the condition for one sample (see class docstring)"""
+        raise NotImplementedError
+
+    def update(self, t, value):
+        """
+        Feed one sample into the rule
+
+        Returns:
+            dict: Transition event if the alert was raised or cleared, else None
+        """
+        state = self.check(t, value)
+        if state is None or state == self.active:
+            self._streak = 0
+            return None
+
+        self._streak += 1
+        if self._streak < self.debounce:
+            return None
+
+        self._streak = 0
+        self.active = state
+        self.since = t
+        return {'name': self.name, 'state': 'raised' if state else 'cleared',
+                'value': self.value, 'time': t}
+
+    def status(self):
+        """Current state of the rule for the API"""
+        return {'name': self.name, 'kind': self.kind, 'channel': self.channel,
+                'active': self.active, 'since': self.since, 'value': self.value,
+                'message': self.message}
+
+
+class ThresholdRule(Rule):
+    """Value above a threshold for a sustained window"""
+
+    kind = 'threshold'
+
+    def __init__(self, name, channel, raise_above, clear_below=None, window=300, **kwargs):
+        """
+        Args:
+            raise_above: Alert when every sample for `window` seconds is above this
+            clear_below: Clear when a sample drops below this (default: raise_above)
+            window: Seconds the value must stay above raise_above
+        """
+        super().__init__(name, channel, **kwargs)
+        self.raise_above = raise_above
+        self.clear_below = raise_above if clear_below is None else clear_below
+        self.window = window
+        self._above_since = None
+
+    def check(self, t, value):
+        self.value = value
+        if value > self.raise_above:
+            if self._above_since is None:
+                self._above_since = t
+            return True if t - self._above_since >= self.window else None
+        self._above_since = None
+        return False if value < self.clear_below else None
+
+
+class RateOfChangeRule(Rule):
+    """Value rising faster than a given rate over a sliding window"""
+
+    kind = 'rate'
+
+    def __init__(self, name, channel, rate, window=60, clear_rate=None, **kwargs):
+        """
+        Args:
+            rate: Alert when the rise exceeds this many units per minute
+            window: Seconds of samples the rate is measured over
+            clear_rate: Clear below this rate (default: half of `rate`)
+        """
+        super().__init__(name, channel, **kwargs)
+        self.rate = rate
+        self.clear_rate = rate / 2 if clear_rate is None else clear_rate
+        self.window = window
+        self._samples = deque()
+
+    def check(self, t, value):
+        samples = self._samples
+        previous = samples[-1] if samples else None
+        samples.append((t, value))
+        # Each sample is appended and popped once, so this is amortized O(1)
+        while t - samples[0][0] > self.window:
+            samples.popleft()
+
+        if len(samples) > 1:
+            t0, v0 = samples[0]
+            if t - t0 < self.window / 2:
+                return None  # not enough history yet
+        elif previous is not None:
+            # Samples further apart than the window (adaptive sampling):
+            # measure over the last gap rather than never judging again
+            t0, v0 = previous
+        else:
+            return None
+        self.value = (value - v0) * 60 / (t - t0)
+        if self.value > self.rate:
+            return True
+        return False if self.value < self.clear_rate else None
+
+
+class NowCastRule(Rule):
+    """
+    EPA NowCast-style weighted average over the last 12 hourly means
+
+    Recent hours get more weight when concentrations are changing, which
+    makes it react faster than a plain 12 hour average.
+    """
+
+    kind = 'nowcast'
+
+    def __init__(self, name, channel, raise_above, clear_below=None, hours=12, min_weight=0.5, **kwargs):
+        """
+        Args:
+            raise_above: Alert when the NowCast exceeds this
+            clear_below: Clear when it drops below this (default: raise_above)
+            hours: Number of hourly means in the average
+            min_weight: Lower bound of the weight factor
+        """
+        super().__init__(name, channel, **kwargs)
+        self.raise_above = raise_above
+        self.clear_below = raise_above if clear_below is None else clear_below
+        self.min_weight = min_weight
+        self._hours = deque(maxlen=hours - 1)
+        self._hour = None
+        self._sum = 0.0
+        self._count = 0
+
+    def check(self, t, value):
+        hour = int(t // 3600)
+        if hour != self._hour:
+            if self._count:
+                self._hours.appendleft(self._sum / self._count)
+            self._hour, self._sum, self._count = hour, 0.0, 0
+        self._sum += value
+        self._count += 1
+
+        # Current (partial) hour first, then completed hours newest to oldest
+        means = [self._sum / self._count]
+        means.extend(self._hours)
+        hi, lo = max(means), min(means)
+        weight = max(lo / hi, self.min_weight) if hi > 0 else 1.0
+
+        num = den = 0.0
+        factor = 1.0
+        for mean in means:
+            num += mean * factor
+            den += factor
+            factor *= weight
+        self.value = num / den
+
+        if self.value > self.raise_above:
+            return True
+        return False if self.value < self.clear_below else None
+
+
+class FlatlineRule(Rule):
+    """Sensor stuck: the value barely moves over a window of samples"""
+
+    kind = 'flatline'
+
+    def __init__(self, name, channel, window=600, min_samples=20, epsilon=0.0, min_level=None, **kwargs):
+        """
+        Args:
+            window: Seconds of samples to inspect
+            min_samples: Samples needed in the window before judging
+            epsilon: Alert when max - min over the window is at most this
+            min_level: Never alert while the window max is at or below this;
+                       a steady low reading is normal in clean air
+        """
+        super().__init__(name, channel, **kwargs)
+        self.window = window
+        self.min_samples = min_samples
+        self.epsilon = epsilon
+        self.min_level = min_level
+        self._times = deque()
+        self._start = None
+        # Monotonic deques of (t, value) give the window min and max in O(1)
+        self._min = deque()
+        self._max = deque()
+
+    def check(self, t, value):
+        if self._start is None:
+            self._start = t
+        self._times.append(t)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((t, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((t, value))
+
+        oldest = t - self.window
+        while self._times[0] < oldest:
+            self._times.popleft()
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+
+        # Only judge once a full window has been observed
+        if t - self._start < self.window:
+            return None
+        if len(self._times) < self.min_samples:
+            # Too sparse to tell a stuck sensor from stable air: clear
+            return False
+        self.value = self._max[0][1] - self._min[0][1]
+        if self.min_level is not None and self._max[0][1] <= self.min_level:
+            return False
+        return self.value <= self.epsilon
+
+
+def default_rules():
+    """Rules used by the dashboard server"""
+    return [
+        ThresholdRule('pm25_high', 'pm25', raise_above=35.4, clear_below=30, window=300,
+                      message='PM2.5 above 35.4 µg/m³ for 5 minutes'),
+        RateOfChangeRule('pm25_spike', 'pm25', rate=10, window=60, debounce=2,
+                         message='PM2.5 rising faster than 10 µg/m³ per minute'),
+        NowCastRule('co2_nowcast', 'co2', raise_above=1000, clear_below=900,
+                    message='CO2 NowCast above 1000 ppm'),
+        # The PMS5003 reads whole µg/m³, so clean air often holds 0-2 for
+        # minutes; only a level that should fluctuate counts as stuck
+        FlatlineRule('pm25_stuck', 'pm25', window=600, min_samples=20, min_level=5,
+                     message='PM2.5 reading has not changed for 10 minutes'),
+        FlatlineRule('co2_stuck', 'co2', window=1800, min_samples=20,
+                     message='CO2 reading has not changed for 30 minutes'),
+    ]
+
+
+class AlertEngine:
+    """Feeds samples to rules and keeps the current alert state"""
+
+    def __init__(self, rules=None, history=100):
+        """
+        Args:
+            rules: List of Rule instances (default: default_rules())
+            history: Number of raise/clear events to remember
+        """
+        self.rules = default_rules() if rules is None else rules
+        self.events = deque(maxlen=history)
+        self.lock = threading.Lock()
+
+    def process(self, sample, t=None):
+        """
+        Evaluate all rules against one sample
+
+        Args:
+            sample: Dict of channel values; missing or None channels are skipped
+            t: Sample time in seconds (default: now)
+
+        Returns:
+            list: Transition events caused by this sample
+        """
+        t = time.time() if t is None else t
+        events = []
+        with self.lock:
+            for rule in self.rules:
+                value = sample.get(rule.channel)
+                if value is None:
+                    continue
+                event = rule.update(t, value)
+                if event:
+                    events.append(event)
+                    self.events.append(event)
+        return events
+
+    def active(self):
+        """Names of alerts that are currently raised"""
+        with self.lock:
+            return [rule.name for rule in self.rules if rule.active]
+
+    def status(self):
+        """Alert state for the API"""
+        with self.lock:
+            return {
+                'active': [rule.name for rule in self.rules if rule.active],
+                'rules': [rule.status() for rule in self.rules],
+                'events': list(self.events)
+            }
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+AirIQ Alert Engine Benchmark
+Replays synthetic samples through the default rules and reports throughput
+"""
+
+import argparse
+import math
+import random
+import time
+
+from alerts import AlertEngine
+
+
+def make_samples(count, interval):
+    """Synthetic PM2.5/CO2 stream with a daily cycle, smoke events and a stuck stretch"""
+    samples = []
+    for i in range(count):
+        t = i * interval
+        pm25 = 12 + 6 * math.sin(t / 86400 * 2 * math.pi) + random.uniform(-2, 2)
+        if (t // 3600) % 24 == 18:
+            pm25 += 60  # evening cooking smoke
+        co2 = 650 + 400 * max(0.0, math.sin(t / 43200 * math.pi)) + random.uniform(-20, 20)
+        if count // 2 <= i < count // 2 + 1000:
+            pm25 = 7.0
+        samples.append((t, {'pm25': pm25, 'co2': co2}))
+    return samples
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Benchmark the alert engine')
+    parser.add_argument('-n', '--samples', type=int, default=500000, help='Samples to replay')
+    parser.add_argument('--interval', type=float, default=2, help='Seconds between samples')
+    args = parser.parse_args()
+
+    samples = make_samples(args.samples, args.interval)
+    engine = AlertEngine()
+
+    start = time.perf_counter()
+    events = 0
+    for t, sample in samples:
+        events += len(engine.process(sample, t))
+    elapsed = time.perf_counter() - start
+
+    print(f"\nReplayed {args.samples} samples ({args.samples * args.interval / 86400:.1f} days) "
+          f"through {len(engine.rules)} rules")
+    print(f"  Time:       {elapsed:.2f} s")
+    print(f"  Throughput: {args.samples / elapsed:,.0f} samples/s")
+    print(f"  Per sample: {elapsed / args.samples * 1e6:.1f} µs")
+    print(f"  Events:     {events}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+AirIQ Range Query Benchmark
+Fills a scratch database with a year of readings and times dashboard views
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import db
+
+
+def fill_db(days, interval):
+    """Insert `days` of readings every `interval` seconds, then build rollups"""
+    now = datetime.now()
+    count = int(days * 86400 / interval)
+    conn = sqlite3.connect(db.DB_PATH)
+    batch = []
+    for i in range(count):
+        batch.append((now - timedelta(seconds=i * interval), 2.5 + random.uniform(-0.5, 1.0),
+                      10 + random.uniform(-2, 5), 16 + random.uniform(-3, 8)))
+        if len(batch) == 50000:
+            conn.executemany('INSERT INTO readings (timestamp, pm1, pm25, pm10) VALUES (?, ?, ?, ?)', batch)
+            batch = []
+    conn.executemany('INSERT INTO readings (timestamp, pm1, pm25, pm10) VALUES (?, ?, ?, ?)', batch)
+    conn.commit()
+    db.rebuild_rollups(conn)
+    conn.close()
+    return count
+
+
+def best_of(fn, repeat):
+    """Run fn `repeat` times and return (best seconds, last result)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Benchmark range queries over a year of data')
+    parser.add_argument('--days', type=float, default=365, help='Days of data (default: 365)')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between readings (default: 30)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per case (best is reported)')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(tmpdir, 'bench.db')
+    db.init_db()
+
+    start = time.perf_counter()
+    count = fill_db(args.days, args.interval)
+    print(f"\nInserted {count} readings in {time.perf_counter() - start:.1f}s")
+
+    now = datetime.now()
+    views = [('24h', timedelta(hours=24)), ('week', timedelta(days=7)),
+             ('month', timedelta(days=30)), ('year', timedelta(days=365))]
+
+    print(f"\n{'VIEW':<22} {'SOURCE':<8} {'STEP':>6} {'ROWS':>6} {'BEST ms':>9}")
+    print("-" * 56)
+    seconds, rows = best_of(db.get_history_24h, args.repeat)
+    print(f"{'24h get_history_24h':<22} {'raw':<8} {'-':>6} {len(rows):>6} {seconds * 1000:>9.2f}")
+    for name, span in views:
+        plan = db.plan_query(now - span, now)
+        seconds, rows = best_of(lambda: list(db.query(now - span, now, plan=plan)), args.repeat)
+        print(f"{name + ' query()':<22} {plan['source']:<8} {plan['step']:>6} {len(rows):>6} {seconds * 1000:>9.2f}")
+    print()
+
+    os.remove(db.DB_PATH)
+    os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+AirIQ Adaptive Sampling Benchmark
+Replays simulated days of the 'daily' scenario in simulated time, once at a
+fixed interval and once with the adaptive scheduler, and compares samples,
+database writes and size, sensor on-time, CPU time and the events seen
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import db
+from air_quality import get_air_quality_level
+from alerts import AlertEngine
+from filters import create_pipeline
+from sampling import AdaptiveScheduler
+from sources import SimulatedSource
+
+
+class Clock:
+    """Simulated time: sleep() advances it instantly"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def replay(days, interval, scheduler=None, seed=1):
+    """
+    Run the sampling loop of run_server.sample_loop in simulated time
+
+    Returns:
+        dict: Samples, events, database size, sensor on-time and CPU time
+    """
+    random.seed(seed)
+    start = time.mktime(datetime(2025, 11, 3).timetuple())
+    clock = Clock(start)
+    source = SimulatedSource('daily', clock=clock.time)
+    pipeline = create_pipeline('hampel')
+    engine = AlertEngine()
+
+    tmpdir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(tmpdir, 'bench.db')
+    db.init_db()
+
+    samples = []
+    events = []
+    awake = 0.0
+    cpu = time.process_time()
+    while clock.now < start + days * 86400:
+        raw = source.read()
+        data = pipeline.process(raw)
+        db.insert_reading(data['pm1'], data['pm25'], data['pm10'], data['co2'],
+                          timestamp=datetime.fromtimestamp(clock.now))
+        events += [(e['name'], e['state'], e['time']) for e in engine.process(data, clock.now)]
+        samples.append((clock.now, raw['pm25']))
+        if scheduler:
+            scheduler.update(raw)
+            before = scheduler.slept
+            scheduler.wait(source, clock.sleep)
+            awake += scheduler.interval - (scheduler.slept - before)
+        else:
+            clock.sleep(interval)
+            awake += interval
+    cpu = time.process_time() - cpu
+
+    size = sum(os.path.getsize(os.path.join(tmpdir, f)) for f in os.listdir(tmpdir))
+    return {'samples': samples, 'events': events, 'size': size, 'awake': awake, 'cpu': cpu}
+
+
+def episodes(samples, min_length=60):
+    """(level, start, end) runs of one AQI level lasting at least min_length seconds"""
+    runs = []
+    for t, pm25 in samples:
+        level = get_air_quality_level(pm25)['level']
+        if runs and runs[-1][0] == level:
+            runs[-1][2] = t
+        else:
+            runs.append([level, t, t])
+    return [r for r in runs if r[2] - r[1] >= min_length]
+
+
+def detection(fixed, adaptive):
+    """
+    Match the AQI level episodes and alerts seen at the fixed rate in an adaptive run
+
+    Returns:
+        tuple: (episodes missed, detection delays, {alert event: delay or None})
+    """
+    times = [t for t, _ in adaptive['samples']]
+    levels = [get_air_quality_level(v)['level'] for _, v in adaptive['samples']]
+    missed, delays = [], []
+    for level, t0, t1 in episodes(fixed['samples']):
+        seen = [t for t, lv in zip(times, levels) if t0 <= t <= t1 and lv == level]
+        if seen:
+            delays.append(seen[0] - t0)
+        else:
+            missed.append((level, t0, t1 - t0))
+
+    alerts = {}
+    for name, state, t in fixed['events']:
+        match = [u for n, s, u in adaptive['events'] if n == name and s == state and abs(u - t) < 3600]
+        alerts[(name, state, t)] = match[0] - t if match else None
+    return missed, delays, alerts
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Compare fixed and adaptive sampling')
+    parser.add_argument('--days', type=float, default=1, help='Simulated days (default: 1)')
+    parser.add_argument('--interval', type=float, default=2, help='Fixed / fastest interval (default: 2)')
+    parser.add_argument('--max-interval', type=float, nargs='+', default=[120],
+                        help='Longest adaptive interval; several values compare them (default: 120)')
+    args = parser.parse_args()
+
+    fixed = replay(args.days, args.interval)
+    runs = [replay(args.days, args.interval, AdaptiveScheduler(min_interval=args.interval, max_interval=m))
+            for m in args.max_interval]
+
+    total = args.days * 86400
+    print(f"\n{args.days:g} simulated day(s), fixed {args.interval:g}s vs adaptive "
+          f"{args.interval:g}s up to --max-interval")
+    print(f"{'':<22} {'fixed':>10}" + ''.join(f" {f'max {m:g}s':>10} {'saved':>6}" for m in args.max_interval))
+    for name, key, fmt in (('Samples / DB writes', 'samples', len), ('DB size (KB)', 'size', lambda v: v / 1024),
+                           ('Sensor on (h)', 'awake', lambda v: v / 3600), ('CPU (s)', 'cpu', float)):
+        a = fmt(fixed[key])
+        print(f"{name:<22} {a:>10,.1f}" + ''.join(f" {fmt(r[key]):>10,.1f} {1 - fmt(r[key]) / a:>6.0%}" for r in runs))
+    print(f"{'Sensor duty cycle':<22} {fixed['awake'] / total:>10.0%}"
+          + ''.join(f" {r['awake'] / total:>10.0%} {'':>6}" for r in runs))
+
+    # Events: every AQI level episode (of a minute or more) and alert seen at
+    # the fixed rate should also be seen adaptively, and not much later
+    results = [detection(fixed, r) for r in runs]
+    count = len(episodes(fixed['samples']))
+    print(f"\n{'AQI level episodes':<22} {count:>10}"
+          + ''.join(f" {f'{len(m)} missed':>10} {'':>6}" for m, _, _ in results))
+    print(f"{'Detection delay max':<22} {'':>10}"
+          + ''.join(f" {max(d, default=0):>9.0f}s {'':>6}" for _, d, _ in results))
+    for m, (missed, _, _) in zip(args.max_interval, results):
+        for level, t0, length in missed:
+            print(f"  max {m:g}s missed: {time.strftime('%H:%M:%S', time.localtime(t0))} "
+                  f"{level} for {length:.0f}s")
+
+    print("\nAlert events (fixed -> adaptive delay):")
+    for event in fixed['events']:
+        name, state, t = event
+        delays = [a[event] for _, _, a in results]
+        print(f"  {time.strftime('%H:%M', time.localtime(t))} {name + ' ' + state:<24}"
+              + ''.join(f" {'MISSED' if d is None else f'{d:+.0f}s':>10} {'':>6}" for d in delays))
+    print(f"{'Peak PM2.5':<22} {max(v for _, v in fixed['samples']):>10.1f}"
+          + ''.join(f" {max(v for _, v in r['samples']):>10.1f} {'':>6}" for r in runs))
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+AirIQ JSON Encoding Benchmark
+Compares encoding time and payload size of 24h history responses
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import db
+import serialize
+
+
+def fill_db(points, hours=24):
+    """Insert `points` readings spread evenly over the last `hours` hours"""
+    now = datetime.now()
+    step = timedelta(hours=hours) / points
+    rows = [(now - step * i, 2.5 + random.uniform(-0.5, 1.0), 10 + random.uniform(-2, 5),
+             16 + random.uniform(-3, 8)) for i in range(points)]
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.executemany('INSERT INTO readings (timestamp, pm1, pm25, pm10) VALUES (?, ?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+def best_of(fn, repeat):
+    """Run fn `repeat` times and return (best seconds, last result)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Benchmark history JSON encoding')
+    parser.add_argument('-p', '--points', type=int, default=17280, help='Readings in 24h (default: 5 s interval)')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='Runs per case (best is reported)')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(tmpdir, 'bench.db')
+    db.init_db()
+    fill_db(args.points)
+
+    start = datetime.now() - timedelta(hours=24)
+    rows = db.get_history_rows(start)
+    cache = serialize.HistoryCache(hours=24)
+
+    cases = [
+        ('dicts + json.dumps (old)',
+         lambda: json.dumps([{'time': r[0], 'pm25': r[1], 'pm10': r[2]} for r in rows]).encode('utf-8')),
+        ('tuples -> rows',
+         lambda: serialize.encode_rows(serialize.HISTORY_COLUMNS, rows, 'rows')),
+        ('tuples -> columnar',
+         lambda: serialize.encode_rows(serialize.HISTORY_COLUMNS, rows, 'columnar')),
+        ('query + encode (old)',
+         lambda: json.dumps(db.get_history_24h()).encode('utf-8')),
+        ('hour cache, rows',
+         lambda: cache.encode('rows')),
+        ('hour cache, columnar',
+         lambda: cache.encode('columnar')),
+    ]
+
+    print(f"\n{len(rows)} points, orjson: {'yes' if serialize.orjson else 'no'}")
+    print(f"\n{'CASE':<28} {'BEST ms':>9} {'BYTES':>10}")
+    print("-" * 50)
+    for name, fn in cases:
+        seconds, payload = best_of(fn, args.repeat)
+        print(f"{name:<28} {seconds * 1000:>9.2f} {len(payload):>10}")
+    print()
+
+    os.remove(db.DB_PATH)
+    os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
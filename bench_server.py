@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+AirIQ Server Benchmark
+Measures request latency and memory footprint of a running dashboard server
+"""
+
+import argparse
+import http.client
+import statistics
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from memory import rss_kb
+
+DEFAULT_ENDPOINTS = ['/api/data', '/api/history', '/api/status', '/api/db/all']
+
+
+def client_address(i):
+    """Loopback source address of simulated client i (127.1.x.y)"""
+    return f'127.1.{i // 250}.{i % 250 + 1}'
+
+
+def time_request(url, source=None):
+    """
+    Fetch a URL and return (status, seconds, bytes)
+
+    Args:
+        url: URL to fetch
+        source: Local address to connect from (None = any)
+
+    Returns:
+        tuple: Status is 0 if the connection failed
+    """
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30,
+                                          source_address=(source, 0) if source else None)
+        conn.request('GET', path)
+        resp = conn.getresponse()
+        body = resp.read()
+        status = resp.status
+        conn.close()
+    except OSError:
+        body = b''
+        status = 0
+    return status, time.perf_counter() - start, len(body)
+
+
+def bench_endpoint(base, path, requests, concurrency, distinct_clients=False):
+    """
+    Hit one endpoint repeatedly and summarise latency
+
+    Args:
+        distinct_clients: Give each concurrent client its own loopback
+                          address, so per-client rate limits apply as they
+                          would to separate devices
+
+    Returns:
+        dict: Latency percentiles in milliseconds, response size and status counts
+    """
+    url = base.rstrip('/') + path
+
+    def fetch(i):
+        return time_request(url, client_address(i % concurrency) if distinct_clients else None)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, range(requests)))
+
+    times = sorted(r[1] * 1000 for r in results)
+    ok = [r for r in results if r[0] == 200]
+    return {
+        'path': path,
+        'p50': statistics.median(times),
+        'p95': times[int(len(times) * 0.95) - 1],
+        'max': times[-1],
+        'bytes': ok[-1][2] if ok else 0,
+        'ok': len(ok),
+        'limited': sum(1 for r in results if r[0] == 429),
+        'busy': sum(1 for r in results if r[0] == 503),
+        'failed': sum(1 for r in results if r[0] not in (200, 429, 503)),
+    }
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Benchmark an AirIQ dashboard server')
+    parser.add_argument('--url', default='http://localhost:8000', help='Server base URL')
+    parser.add_argument('--pid', type=int, help='Server process id (for RSS measurement)')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--distinct-clients', action='store_true',
+                        help='Connect each client from its own 127.1.x.y address (local servers only)')
+    parser.add_argument('endpoints', nargs='*', default=DEFAULT_ENDPOINTS)
+    args = parser.parse_intermixed_args()
+
+    if args.pid:
+        print(f"RSS before: {rss_kb(args.pid)} kB")
+
+    print(f"\n{'ENDPOINT':<16} {'P50 ms':>8} {'P95 ms':>8} {'MAX ms':>8} {'BYTES':>9} "
+          f"{'OK':>5} {'429':>5} {'503':>5} {'FAIL':>5}")
+    print("-" * 80)
+    for path in args.endpoints:
+        r = bench_endpoint(args.url, path, args.requests, args.concurrency, args.distinct_clients)
+        print(f"{r['path']:<16} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['max']:>8.2f} {r['bytes']:>9} "
+              f"{r['ok']:>5} {r['limited']:>5} {r['busy']:>5} {r['failed']:>5}")
+
+    if args.pid:
+        print(f"\nRSS after: {rss_kb(args.pid)} kB")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,174 @@
 """SQLite database for AirIQ sensor readings"""
 import sqlite3
 import os
+import re
+import time
+import calendar
 from datetime import datetime, timedelta
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'airiq.db')
 
+# Columns that can be queried and rolled up
+CHANNELS = ('pm1', 'pm25', 'pm10', 'co2')
+
+# Rollup bucket sizes in seconds (minute, hour, day). Raw readings and minute
+# rollups follow clear_old_data(); hourly and daily rollups are the long-term
+# archive used for month and year views.
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+RAW_COLUMNS = tuple(f'{ch}_raw' for ch in CHANNELS)
+
+AGGREGATES = ('avg', 'min', 'max', 'count')
+
+# Steps the planner picks from when a query does not specify one
+AUTO_STEPS = (60, 300, 900, 3600, 21600, 86400)
+AUTO_MAX_POINTS = 1000
+
+# Longest duration parse_duration() accepts (100 years)
+MAX_DURATION = 100 * 31536000
+
+# Per-request budgets for query()
+MAX_ROWS = 20000
+TIME_BUDGET = 2.0
+
+
+class QueryError(ValueError):
+    """Raised when a range query is invalid or exceeds its budget"""
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(dt):
+    """Seconds since epoch for a naive local datetime, as SQLite's strftime('%s') computes it"""
+    return calendar.timegm(dt.timetuple())
+
+
+def _rollup_upsert_sql():
+    """Build the statement that folds one reading into a rollup bucket"""
+    cols, updates = [], []
+    for ch in CHANNELS:
+        cols += [f'{ch}_n', f'{ch}_sum', f'{ch}_min', f'{ch}_max']
+        updates += [
+            f'{ch}_n = {ch}_n + excluded.{ch}_n',
+            f'{ch}_sum = {ch}_sum + excluded.{ch}_sum',
+            f'{ch}_min = min(coalesce({ch}_min, excluded.{ch}_min), coalesce(excluded.{ch}_min, {ch}_min))',
+            f'{ch}_max = max(coalesce({ch}_max, excluded.{ch}_max), coalesce(excluded.{ch}_max, {ch}_max))',
+        ]
+    placeholders = ', '.join('?' * (len(cols) + 2))
+    return (f'INSERT INTO rollups (resolution, bucket, {", ".join(cols)}) VALUES ({placeholders}) '
+            f'ON CONFLICT (resolution, bucket) DO UPDATE SET {", ".join(updates)}')
+
+
+ROLLUP_UPSERT = _rollup_upsert_sql()
+
+
+def rebuild_rollups(conn=None):
+    """
+    Recompute all rollups from the raw readings table
+
+    Only needed after bulk imports that bypass insert_reading().
+    """
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('DELETE FROM rollups')
+    aggs = ', '.join(f'COUNT({ch}), TOTAL({ch}), MIN({ch}), MAX({ch})' for ch in CHANNELS)
+    cols = ', '.join(f'{ch}_n, {ch}_sum, {ch}_min, {ch}_max' for ch in CHANNELS)
+    for res in ROLLUP_RESOLUTIONS:
+        c.execute(f'''
+            INSERT INTO rollups (resolution, bucket, {cols})
+            SELECT ?, CAST(strftime('%s', timestamp) AS INTEGER) / ? * ? AS b, {aggs}
+            FROM readings GROUP BY b
+        ''', (res, res, res))
+    conn.commit()
+    if own:
+        conn.close()
+
 def init_db():
     """Initialize database with readings table"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
+    # WAL lets long reads (exports, history) run alongside the sampler's inserts
+    c.execute('PRAGMA journal_mode=WAL')
     c.execute('''
         CREATE TABLE IF NOT EXISTS readings (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
             pm1 REAL,
             pm25 REAL,
-            pm10 REAL
+            pm10 REAL,
+            co2 REAL
         )
     ''')
+    # Older databases were created before these columns existed. The *_raw
+    # columns hold unfiltered values when the server runs with --store-raw.
+    columns = [row[1] for row in c.execute('PRAGMA table_info(readings)')]
+    for col in ('co2',) + RAW_COLUMNS:
+        if col not in columns:
+            c.execute(f'ALTER TABLE readings ADD COLUMN {col} REAL')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_readings_timestamp ON readings (timestamp)')
+
+    stats = ', '.join(f'{ch}_n INTEGER, {ch}_sum REAL, {ch}_min REAL, {ch}_max REAL' for ch in CHANNELS)
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS rollups (
+            resolution INTEGER,
+            bucket INTEGER,
+            {stats},
+            PRIMARY KEY (resolution, bucket)
+        ) WITHOUT ROWID
+    ''')
     conn.commit()
+
+    # Databases from before rollups existed get them built once
+    if (c.execute('SELECT 1 FROM rollups LIMIT 1').fetchone() is None
+            and c.execute('SELECT 1 FROM readings LIMIT 1').fetchone() is not None):
+        rebuild_rollups(conn)
     conn.close()
 
-def insert_reading(pm1, pm25, pm10):
-    """Insert a new sensor reading"""
+def insert_reading(pm1, pm25, pm10, co2=None, raw=None, timestamp=None):
+    """
+    Insert a new sensor reading and fold it into the rollups
+
+    Args:
+        pm1, pm25, pm10, co2: Stored (filtered) values
+        raw: Optional (pm1, pm25, pm10, co2) before filtering
+        timestamp: Reading time as a datetime (default: now), for replays
+    """
+    now = timestamp or datetime.now()
+    epoch = _epoch(now)
+    stats = []
+    for value in (pm1, pm25, pm10, co2):
+        if value is None:
+            stats += [0, 0.0, None, None]
+        else:
+            stats += [1, value, value, value]
+
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute('INSERT INTO readings (timestamp, pm1, pm25, pm10) VALUES (?, ?, ?, ?)',
-              (datetime.now(), pm1, pm25, pm10))
+    if raw is None:
+        c.execute('INSERT INTO readings (timestamp, pm1, pm25, pm10, co2) VALUES (?, ?, ?, ?, ?)',
+                  (now, pm1, pm25, pm10, co2))
+    else:
+        c.execute(f'''INSERT INTO readings (timestamp, pm1, pm25, pm10, co2, {", ".join(RAW_COLUMNS)})
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                  (now, pm1, pm25, pm10, co2) + tuple(raw))
+    c.executemany(ROLLUP_UPSERT, [[res, epoch // res * res] + stats for res in ROLLUP_RESOLUTIONS])
     conn.commit()
     conn.close()
 
+LATEST_SQL = 'SELECT pm1, pm25, pm10, co2, timestamp FROM readings ORDER BY timestamp DESC LIMIT 1'
+
 def get_latest_reading():
     """Get the most recent sensor reading"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute('SELECT pm1, pm25, pm10, timestamp FROM readings ORDER BY timestamp DESC LIMIT 1')
+    c.execute(LATEST_SQL)
     row = c.fetchone()
     conn.close()
     if row:
-        return {'pm1': row[0], 'pm25': row[1], 'pm10': row[2], 'timestamp': row[3]}
+        return {'pm1': row[0], 'pm25': row[1], 'pm10': row[2], 'co2': row[3], 'timestamp': row[4]}
     return None
 
 def get_history_24h():
@@ -70,6 +200,62 @@ def get_history_24h():
     
     return history
 
+HISTORY_SQL = '''
+    SELECT strftime('%H:%M', timestamp), pm25, pm10
+    FROM readings WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp
+'''
+
+def get_history_rows(start, end=None):
+    """
+    Get (time, pm25, pm10) tuples for readings in [start, end)
+
+    Args:
+        start: datetime, inclusive
+        end: datetime, exclusive (None = up to the latest reading)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    if end is None:
+        c.execute('''
+            SELECT strftime('%H:%M', timestamp), pm25, pm10
+            FROM readings WHERE timestamp >= ? ORDER BY timestamp
+        ''', (start,))
+    else:
+        c.execute(HISTORY_SQL, (start, end))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def get_all_rows():
+    """Get all readings as (timestamp, pm1, pm25, pm10) tuples, newest first"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('SELECT timestamp, pm1, pm25, pm10 FROM readings ORDER BY timestamp DESC')
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def iter_all_rows(chunk_rows=2000):
+    """
+    Stream all readings as (timestamp, pm1, pm25, pm10) tuples, newest first
+
+    Only one chunk of rows is in memory at a time.
+
+    Yields:
+        tuple: One reading
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        c = conn.cursor()
+        c.execute('SELECT timestamp, pm1, pm25, pm10 FROM readings ORDER BY timestamp DESC')
+        while True:
+            chunk = c.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            yield from chunk
+    finally:
+        conn.close()
+
 def get_all_records():
     """Get all sensor readings from database"""
     conn = sqlite3.connect(DB_PATH)
@@ -82,12 +268,423 @@ def get_all_records():
                for row in rows]
     return records
 
+def parse_duration(value):
+    """
+    Parse a duration such as '90', '15m', '6h', '7d', '2w' or '1y'
+
+    Returns:
+        int: Seconds
+    """
+    m = re.fullmatch(r'(\d+)([smhdwy]?)', str(value).strip())
+    if not m:
+        raise QueryError(f"Invalid duration: {value}")
+    unit = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'y': 31536000}[m.group(2)]
+    seconds = int(m.group(1)) * unit
+    if seconds > MAX_DURATION:
+        raise QueryError(f"Duration too long: {value}")
+    return seconds
+
+def parse_time(value, now=None):
+    """
+    Parse a query time: 'now', relative ('-24h', '-7d') or ISO ('2025-11-28 17:45')
+
+    Times with an offset ('2025-11-01T00:00:00Z') are converted to local time.
+
+    Returns:
+        datetime: Naive local time
+    """
+    now = now or datetime.now()
+    value = str(value).strip()
+    try:
+        if value == 'now':
+            return now
+        if value.startswith('-'):
+            return now - timedelta(seconds=parse_duration(value[1:]))
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed
+    except (ValueError, OverflowError):
+        raise QueryError(f"Invalid time: {value}")
+
+def auto_step(start, end, max_points=AUTO_MAX_POINTS):
+    """Smallest standard step that keeps the window under max_points buckets"""
+    span = (end - start).total_seconds()
+    for step in AUTO_STEPS:
+        if span / step <= max_points:
+            return step
+    return AUTO_STEPS[-1]
+
+def plan_query(start, end, channels=('pm25', 'pm10'), step=None, agg='avg'):
+    """
+    Choose where a range query reads from and build its SQL
+
+    A step of 0 returns raw readings. Otherwise the coarsest rollup whose
+    resolution divides the step is used, falling back to grouping raw
+    readings for steps that no rollup can serve.
+
+    Returns:
+        dict: source, resolution, step, buckets, sql and params
+    """
+    if end <= start:
+        raise QueryError('Query end must be after start')
+    for ch in channels:
+        if ch not in CHANNELS + RAW_COLUMNS:
+            raise QueryError(f"Unknown channel: {ch}")
+    if agg not in AGGREGATES:
+        raise QueryError(f"Unknown aggregate: {agg}")
+    if step is None:
+        step = auto_step(start, end)
+    if step < 0:
+        raise QueryError('Step must not be negative')
+
+    if step == 0:
+        cols = ', '.join(channels)
+        return {
+            'source': 'raw', 'resolution': 0, 'step': 0, 'buckets': None,
+            'sql': f'''SELECT strftime('%Y-%m-%d %H:%M:%S', timestamp), {cols} FROM readings
+                       WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp''',
+            'params': (start, end),
+        }
+
+    start_e = _epoch(start) // step * step
+    end_e = _epoch(end)
+    buckets = -(-(end_e - start_e) // step)
+
+    # Unfiltered values are only kept in the readings table
+    resolution = None
+    if not any(ch in RAW_COLUMNS for ch in channels):
+        resolution = next((r for r in sorted(ROLLUP_RESOLUTIONS, reverse=True)
+                           if r <= step and step % r == 0), None)
+    if resolution is None:
+        expr = {'avg': 'AVG({c})', 'min': 'MIN({c})', 'max': 'MAX({c})', 'count': 'COUNT({c})'}[agg]
+        cols = ', '.join(expr.format(c=ch) for ch in channels)
+        return {
+            'source': 'raw', 'resolution': 0, 'step': step, 'buckets': buckets,
+            'sql': f'''SELECT datetime(CAST(strftime('%s', timestamp) AS INTEGER) / ? * ?, 'unixepoch') AS t, {cols}
+                       FROM readings WHERE timestamp >= ? AND timestamp < ? GROUP BY t ORDER BY t''',
+            'params': (step, step, EPOCH + timedelta(seconds=start_e), end),
+        }
+
+    expr = {'avg': 'TOTAL({c}_sum) / NULLIF(SUM({c}_n), 0)', 'min': 'MIN({c}_min)',
+            'max': 'MAX({c}_max)', 'count': 'SUM({c}_n)'}[agg]
+    cols = ', '.join(expr.format(c=ch) for ch in channels)
+    return {
+        'source': 'rollup', 'resolution': resolution, 'step': step, 'buckets': buckets,
+        'sql': f'''SELECT datetime(bucket / ? * ?, 'unixepoch') AS t, {cols}
+                   FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket < ?
+                   GROUP BY t ORDER BY t''',
+        'params': (step, step, resolution, start_e, end_e),
+    }
+
+def query(start, end, channels=('pm25', 'pm10'), step=None, agg='avg',
+          max_rows=MAX_ROWS, time_budget=TIME_BUDGET, plan=None):
+    """
+    Stream a time range as (time, *channels) tuples
+
+    Args:
+        start: datetime, inclusive
+        end: datetime, exclusive
+        channels: Columns to return, from CHANNELS or RAW_COLUMNS
+        step: Bucket size in seconds (0 = raw readings, None = automatic)
+        agg: 'avg', 'min', 'max' or 'count' per bucket
+        max_rows: Refuse queries that would return more rows than this
+        time_budget: Abort the query after this many seconds spent in SQLite
+        plan: Result of plan_query(), if already computed
+
+    Raises:
+        QueryError: Invalid arguments, or a budget is exceeded. Row budget
+                    errors are raised before the first row is yielded.
+    """
+    plan = plan or plan_query(start, end, channels, step, agg)
+
+    # Only time spent inside SQLite counts against the budget, not the time
+    # the caller takes to consume (e.g. send) each chunk
+    clock = {'spent': 0.0, 'began': time.monotonic()}
+
+    def timed(fn, *args):
+        clock['began'] = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            clock['spent'] += time.monotonic() - clock['began']
+
+    conn = sqlite3.connect(DB_PATH)
+    # Returning non-zero from the progress handler interrupts the statement
+    conn.set_progress_handler(
+        lambda: clock['spent'] + time.monotonic() - clock['began'] > time_budget, 10000)
+    try:
+        c = conn.cursor()
+        if plan['buckets'] is None:
+            timed(c.execute, 'SELECT COUNT(*) FROM readings WHERE timestamp >= ? AND timestamp < ?',
+                  plan['params'])
+            rows = c.fetchone()[0]
+        else:
+            rows = plan['buckets']
+        if rows > max_rows:
+            raise QueryError(f"Query would return {rows} rows (limit {max_rows}); use a larger step")
+
+        timed(c.execute, plan['sql'], plan['params'])
+        while True:
+            chunk = timed(c.fetchmany, 1000)
+            if not chunk:
+                break
+            yield from chunk
+    except sqlite3.OperationalError as e:
+        if 'interrupted' in str(e):
+            raise QueryError(f"Query exceeded time budget of {time_budget}s")
+        raise
+    finally:
+        conn.close()
+
+def iter_readings(start=None, end=None, channels=CHANNELS, chunk_rows=10000, epoch_us=False,
+                  csv_lines=False):
+    """
+    Stream raw readings in time order, a chunk at a time
+
+    Unlike query() there are no row or time budgets; this is meant for bulk
+    export. The database runs in WAL mode, so a long export does not block
+    the sampler's inserts.
+
+    Args:
+        start: datetime, inclusive (None = first reading)
+        end: datetime, exclusive (None = last reading)
+        channels: Columns to return, from CHANNELS or RAW_COLUMNS
+        chunk_rows: Rows per yielded list
+        epoch_us: Return timestamps as microseconds since epoch instead of text
+        csv_lines: Have SQLite format each row as one CSV line; chunks are
+                   then lists of 1-tuples holding the line (twice as fast as
+                   the csv module)
+
+    Yields:
+        list: (timestamp, *channels) tuples
+    """
+    for ch in channels:
+        if ch not in CHANNELS + RAW_COLUMNS:
+            raise QueryError(f"Unknown channel: {ch}")
+    # Whole seconds of the text without its fraction (SQLite's own date maths
+    # rounds to milliseconds), plus the fraction digits of the stored text
+    # ('...:SS' or '...:SS.ffffff'), so microseconds stay exact
+    ts = ("CAST(strftime('%s', substr(timestamp, 1, 19)) AS INTEGER) * 1000000"
+          " + CAST(substr(substr(timestamp, 21) || '000000', 1, 6) AS INTEGER)" if epoch_us
+          else "timestamp")
+    if csv_lines:
+        # SQLite's REAL to text keeps 15 digits; 17 round-trip like Parquet/Arrow.
+        # printf() turns NULL into 0, so missing values are tested first.
+        values = [f"CASE WHEN {ch} IS NULL THEN '' ELSE printf('%!.17g', {ch}) END" for ch in channels]
+        select = " || ',' || ".join([ts] + values) + " || char(10)"
+    else:
+        select = ', '.join([ts] + list(channels))
+    where, params = [], []
+    if start is not None:
+        where.append('timestamp >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('timestamp < ?')
+        params.append(end)
+    sql = f"SELECT {select} FROM readings"
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY timestamp'
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        c = conn.cursor()
+        c.execute(sql, params)
+        while True:
+            chunk = c.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        conn.close()
+
+FOLLOW_SQL = 'SELECT id, timestamp, pm1, pm25, pm10, co2 FROM readings WHERE id > ? ORDER BY id LIMIT ?'
+
+def get_latest_rows(limit=20):
+    """Get the newest readings as (id, timestamp, pm1, pm25, pm10, co2) tuples"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('SELECT id, timestamp, pm1, pm25, pm10, co2 FROM readings ORDER BY timestamp DESC LIMIT ?',
+              (limit,))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def get_rows_after(last_id, limit=1000):
+    """Get readings with id greater than last_id, oldest first (for live follow)"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(FOLLOW_SQL, (last_id, limit))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def _stats_sql(channels):
+    """One-pass aggregate over rollups for the given channels"""
+    cols = ', '.join(f'SUM({ch}_n), TOTAL({ch}_sum) / NULLIF(SUM({ch}_n), 0), MIN({ch}_min), MAX({ch}_max)'
+                     for ch in channels)
+    return (f'SELECT MIN(bucket), MAX(bucket), {cols} FROM rollups '
+            f'WHERE resolution = ? AND bucket >= ? AND bucket < ?')
+
+def get_stats(start=None, end=None, channels=CHANNELS):
+    """
+    Count, average, min and max per channel, read from rollups
+
+    The whole history uses daily rollups (including archived days whose raw
+    readings were pruned). Ranges use minute rollups, or hourly ones for
+    spans over a week, so edges are rounded to that resolution.
+
+    Returns:
+        dict: resolution, first, last and per-channel count/avg/min/max
+    """
+    if start is None and end is None:
+        resolution = ROLLUP_RESOLUTIONS[-1]
+    else:
+        span = ((end or datetime.now()) - (start or EPOCH)).total_seconds()
+        resolution = ROLLUP_RESOLUTIONS[0] if span <= 7 * 86400 else ROLLUP_RESOLUTIONS[1]
+    start_e = _epoch(start) // resolution * resolution if start else 0
+    end_e = _epoch(end) if end else 2 ** 62
+
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(_stats_sql(channels), (resolution, start_e, end_e))
+    row = c.fetchone()
+    conn.close()
+
+    stats = {'resolution': resolution,
+             'first': None if row[0] is None else EPOCH + timedelta(seconds=row[0]),
+             'last': None if row[1] is None else EPOCH + timedelta(seconds=row[1] + resolution),
+             'channels': {}}
+    for i, ch in enumerate(channels):
+        count, avg, lo, hi = row[2 + i * 4:6 + i * 4]
+        stats['channels'][ch] = {'count': count or 0, 'avg': avg, 'min': lo, 'max': hi}
+    return stats
+
+def get_histogram(channel, start=None, end=None, width=1.0):
+    """
+    Histogram of raw values in one pass (memory independent of row count)
+
+    Returns:
+        list: (bin_start, count) tuples in ascending order
+    """
+    if channel not in CHANNELS + RAW_COLUMNS:
+        raise QueryError(f"Unknown channel: {channel}")
+    where, params = [f'{channel} IS NOT NULL'], [width]
+    if start is not None:
+        where.append('timestamp >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('timestamp < ?')
+        params.append(end)
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(f"""SELECT CAST(floor({channel} / ?) AS INTEGER) AS b, COUNT(*) FROM readings
+                  WHERE {' AND '.join(where)} GROUP BY b ORDER BY b""", params)
+    rows = [(b * width, n) for b, n in c.fetchall()]
+    conn.close()
+    return rows
+
+def check_integrity():
+    """
+    Run consistency checks on the database
+
+    Returns:
+        list: (check, ok, detail) tuples; ok is None for warnings
+    """
+    results = []
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+
+    detail = ', '.join(r[0] for r in c.execute('PRAGMA quick_check'))
+    results.append(('sqlite quick_check', detail == 'ok', detail))
+
+    # Minute rollups over the last full day must match the raw rows
+    end = datetime.now().replace(second=0, microsecond=0)
+    start = end - timedelta(days=1)
+    raw = c.execute('SELECT COUNT(pm25) FROM readings WHERE timestamp >= ? AND timestamp < ?',
+                    (start, end)).fetchone()[0]
+    rolled = c.execute('SELECT TOTAL(pm25_n) FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket < ?',
+                       (ROLLUP_RESOLUTIONS[0], _epoch(start), _epoch(end))).fetchone()[0]
+    results.append(('minute rollups match raw (24h)', raw == rolled, f'{raw} raw, {int(rolled)} rolled up'))
+
+    # Hour and day rollups are never pruned, so they must hold the same samples
+    totals = [c.execute('SELECT TOTAL(pm25_n) FROM rollups WHERE resolution = ?', (r,)).fetchone()[0]
+              for r in ROLLUP_RESOLUTIONS[1:]]
+    results.append(('hour and day rollups agree', len(set(totals)) <= 1,
+                    ', '.join(f'{int(t)} samples' for t in totals)))
+
+    missing = c.execute('SELECT COUNT(*) FROM readings WHERE timestamp IS NULL').fetchone()[0]
+    results.append(('readings have timestamps', missing == 0, f'{missing} without timestamp'))
+
+    # PMS5003 reports cumulative size fractions, so PM1 <= PM2.5 <= PM10
+    odd = c.execute('SELECT COUNT(*) FROM readings '
+                    'WHERE pm1 < 0 OR pm25 < 0 OR pm10 < 0 OR pm1 > pm25 OR pm25 > pm10').fetchone()[0]
+    # Implausible values point at sensor trouble, not database damage: warn only
+    results.append(('PM values plausible', odd == 0 or None, f'{odd} negative or out-of-order rows'))
+
+    conn.close()
+    return results
+
+def hot_queries(now=None):
+    """
+    The statements the dashboard and CLI run most, for EXPLAIN QUERY PLAN
+
+    Returns:
+        list: (name, sql, params) tuples
+    """
+    now = now or datetime.now()
+    queries = [
+        ('latest reading', LATEST_SQL, ()),
+        ('history hour', HISTORY_SQL, (now - timedelta(hours=1), now)),
+        ('follow', FOLLOW_SQL, (0, 1000)),
+        ('stats', _stats_sql(CHANNELS), (ROLLUP_RESOLUTIONS[-1], 0, 2 ** 62)),
+    ]
+    for name, days in (('range 24h', 1), ('range week', 7), ('range month', 30), ('range year', 365)):
+        plan = plan_query(now - timedelta(days=days), now)
+        queries.append((f"{name} ({plan['source']}, step {plan['step']})", plan['sql'], plan['params']))
+    return queries
+
+def time_query(sql, params=()):
+    """
+    Run a read-only statement to completion
+
+    Returns:
+        tuple: (row count, seconds)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    began = time.perf_counter()
+    rows = len(conn.execute(sql, params).fetchall())
+    elapsed = time.perf_counter() - began
+    conn.close()
+    return rows, elapsed
+
+def explain(sql, params=()):
+    """
+    EXPLAIN QUERY PLAN for one statement
+
+    Returns:
+        list: Plan detail strings, indented by depth
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    rows = c.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    conn.close()
+    depth = {0: 0}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append('  ' * (depth[node] - 1) + detail)
+    return lines
+
 def clear_old_data(days=30):
-    """Remove readings older than specified days"""
+    """Remove readings and minute rollups older than specified days"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute('DELETE FROM readings WHERE timestamp < datetime("now", "-" || ? || " days")',
               (days,))
+    cutoff = _epoch(datetime.now() - timedelta(days=days))
+    c.execute('DELETE FROM rollups WHERE resolution = ? AND bucket < ?', (ROLLUP_RESOLUTIONS[0], cutoff))
     conn.commit()
     conn.close()
 
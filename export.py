@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+AirIQ Bulk Export
+Streams readings from the database into CSV, Parquet or Arrow IPC files,
+one chunk at a time, so memory stays bounded however long the range is.
+Parquet and Arrow need pyarrow (pip3 install pyarrow); CSV does not.
+"""
+
+import argparse
+import gzip
+import sys
+import time
+
+from db import iter_readings, parse_time, CHANNELS, RAW_COLUMNS, QueryError
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+# Compression codecs accepted per format (None = uncompressed)
+COMPRESSION = {
+    'csv': (None, 'gzip'),
+    'parquet': (None, 'snappy', 'zstd', 'gzip'),
+    'arrow': (None, 'zstd', 'lz4'),
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrows'}
+
+CHUNK_ROWS = 50000
+
+
+class ExportError(ValueError):
+    """Raised for unsupported export options"""
+
+
+def check_options(fmt, compress=None, channels=CHANNELS):
+    """
+    Validate options before any output is written
+
+    Raises:
+        ExportError: Unknown format, codec or channel, or pyarrow is missing
+    """
+    for ch in channels:
+        if ch not in CHANNELS + RAW_COLUMNS:
+            raise ExportError(f"Unknown channel: {ch}")
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format: {fmt}")
+    if compress not in COMPRESSION[fmt]:
+        codecs = ', '.join(c for c in COMPRESSION[fmt] if c)
+        raise ExportError(f"Unsupported compression for {fmt}: {compress} (use {codecs})")
+    if fmt != 'csv':
+        try:
+            import pyarrow
+        except ImportError:
+            raise ExportError(f"{fmt} export needs pyarrow (pip3 install pyarrow)")
+        # pyarrow's own allocator keeps freed buffers; the system heap gives
+        # them back (memory.release() trims it), so RSS does not ratchet up
+        # with every export in a long-running server
+        pyarrow.set_memory_pool(pyarrow.system_memory_pool())
+
+
+def filename(fmt, compress=None):
+    """Suggested download file name"""
+    name = 'airiq' + EXTENSIONS[fmt]
+    return name + '.gz' if fmt == 'csv' and compress == 'gzip' else name
+
+
+def _write_csv(out, chunks, channels, compress):
+    """Write chunks of pre-formatted CSV lines; returns the row count"""
+    stream = gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6) if compress == 'gzip' else out
+    stream.write((','.join(('timestamp',) + tuple(channels)) + '\n').encode('utf-8'))
+    rows = 0
+    for chunk in chunks:
+        stream.write(''.join([line for line, in chunk]).encode('utf-8'))
+        rows += len(chunk)
+    if stream is not out:
+        stream.close()
+    return rows
+
+
+def _arrow_schema(channels):
+    """Arrow schema: microsecond timestamp plus one float64 column per channel"""
+    import pyarrow as pa
+    return pa.schema([('timestamp', pa.timestamp('us'))] + [(ch, pa.float64()) for ch in channels])
+
+
+def _record_batch(schema, chunk):
+    """Convert a list of row tuples to an Arrow record batch"""
+    import pyarrow as pa
+    columns = list(zip(*chunk))
+    return pa.record_batch([pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                           schema=schema)
+
+
+def _write_parquet(out, chunks, channels, compress):
+    """Write chunks as Parquet, one row group per chunk; returns the row count"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _arrow_schema(channels)
+    rows = 0
+    with pq.ParquetWriter(pa.PythonFile(out, mode='w'), schema, compression=compress or 'none') as writer:
+        for chunk in chunks:
+            writer.write_batch(_record_batch(schema, chunk))
+            rows += len(chunk)
+    return rows
+
+
+def _write_arrow(out, chunks, channels, compress):
+    """Write chunks as an Arrow IPC stream, one record batch per chunk; returns the row count"""
+    import pyarrow as pa
+    schema = _arrow_schema(channels)
+    options = pa.ipc.IpcWriteOptions(compression=compress)
+    rows = 0
+    with pa.ipc.new_stream(pa.PythonFile(out, mode='w'), schema, options=options) as writer:
+        for chunk in chunks:
+            writer.write_batch(_record_batch(schema, chunk))
+            rows += len(chunk)
+    return rows
+
+
+def export(out, fmt='csv', start=None, end=None, channels=CHANNELS, compress=None, chunk_rows=CHUNK_ROWS):
+    """
+    Stream readings into a binary file-like object
+
+    Args:
+        out: Writable binary stream (file, socket wfile, ...)
+        fmt: 'csv', 'parquet' or 'arrow'
+        start: datetime, inclusive (None = first reading)
+        end: datetime, exclusive (None = last reading)
+        channels: Columns to export
+        compress: Codec from COMPRESSION[fmt], or None
+        chunk_rows: Rows read and written per chunk (bounds memory)
+
+    Returns:
+        int: Number of rows written
+    """
+    check_options(fmt, compress, channels)
+    chunks = iter_readings(start, end, channels, chunk_rows,
+                           epoch_us=(fmt != 'csv'), csv_lines=(fmt == 'csv'))
+    writer = {'csv': _write_csv, 'parquet': _write_parquet, 'arrow': _write_arrow}[fmt]
+    return writer(out, chunks, channels, compress)
+
+
+def main():
+    """Export from the command line"""
+    parser = argparse.ArgumentParser(description='Export AirIQ readings')
+    parser.add_argument('format', choices=FORMATS)
+    parser.add_argument('output', help="Output file ('-' for stdout)")
+    parser.add_argument('--from', dest='start', help="Start time ('2025-11-01', or --from=-30d for relative)")
+    parser.add_argument('--to', dest='end', help="End time (default: now)")
+    parser.add_argument('--channels', default=','.join(CHANNELS), help='Comma separated columns')
+    parser.add_argument('--compress', default=None, help='gzip (csv); snappy, zstd, gzip (parquet); zstd, lz4 (arrow)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='Rows per chunk')
+    args = parser.parse_args()
+
+    try:
+        start = parse_time(args.start) if args.start else None
+        end = parse_time(args.end) if args.end else None
+        channels = tuple(args.channels.split(','))
+        check_options(args.format, args.compress, channels)
+
+        began = time.perf_counter()
+        if args.output == '-':
+            rows = export(sys.stdout.buffer, args.format, start, end, channels, args.compress, args.chunk_rows)
+        else:
+            with open(args.output, 'wb') as f:
+                rows = export(f, args.format, start, end, channels, args.compress, args.chunk_rows)
+        elapsed = time.perf_counter() - began
+    except (ExportError, QueryError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Exported {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Streaming filters for AirIQ sensor readings
+Sits between the sensor drivers and storage. Every filter keeps a small,
+fixed amount of state per channel (at most `window` values), so memory
+does not grow with uptime.
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+
+
+class RollingMedian:
+    """Median of the last `window` values"""
+
+    def __init__(self, window=5):
+        """
+        Args:
+            window: Number of samples in the median (odd works best)
+        """
+        self.window = window
+        self._values = deque()
+        self._sorted = []
+
+    def _push(self, value):
+        """Add a value to the window, evicting the oldest if full"""
+        if len(self._values) == self.window:
+            old = self._values.popleft()
+            del self._sorted[bisect_left(self._sorted, old)]
+        self._values.append(value)
+        insort(self._sorted, value)
+
+    def median(self):
+        """Median of the current window"""
+        s = self._sorted
+        n = len(s)
+        mid = n // 2
+        return s[mid] if n % 2 else (s[mid - 1] + s[mid]) / 2
+
+    def update(self, value):
+        """Add a sample and return the filtered value"""
+        self._push(value)
+        return self.median()
+
+
+class EMA:
+    """Exponential moving average"""
+
+    def __init__(self, alpha=0.3):
+        """
+        Args:
+            alpha: Weight of the newest sample (0 < alpha <= 1); lower is smoother
+        """
+        self.alpha = alpha
+        self._value = None
+
+    def update(self, value):
+        """Add a sample and return the filtered value"""
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+
+class Hampel(RollingMedian):
+    """
+    Hampel outlier rejection
+
+    A sample further than `n_sigmas` robust standard deviations (1.4826 x
+    median absolute deviation) from the rolling median is replaced by that
+    median. Other samples pass through unchanged. Raw values stay in the
+    window, so a genuine level shift is accepted once it fills half of it.
+    """
+
+    def __init__(self, window=7, n_sigmas=3.0, min_deviation=1.0):
+        """
+        Args:
+            window: Number of trailing samples the median and MAD use
+            n_sigmas: Rejection threshold in robust standard deviations
+            min_deviation: Smallest deviation ever treated as an outlier,
+                           so a perfectly flat window does not reject every change
+        """
+        super().__init__(window)
+        self.n_sigmas = n_sigmas
+        self.min_deviation = min_deviation
+        self.rejected = 0
+
+    def update(self, value):
+        """Add a sample and return it, or the median if it is an outlier"""
+        self._push(value)
+        if len(self._values) < 3:
+            return value
+        med = self.median()
+        mad = sorted(abs(v - med) for v in self._sorted)[len(self._sorted) // 2]
+        limit = max(self.n_sigmas * 1.4826 * mad, self.min_deviation)
+        if abs(value - med) > limit:
+            self.rejected += 1
+            return med
+        return value
+
+
+def kohler_humidity_correction(kappa=0.62, channels=('pm1', 'pm25', 'pm10')):
+    """
+    Build a correction hook for optical PM sensors at high humidity
+
+    Particles swell with water above ~60% RH and read high. This applies
+    the kappa-Koehler growth factor when the sample has a 'humidity' value.
+
+    Args:
+        kappa: Hygroscopicity of the aerosol (0.62 is a common urban value)
+        channels: Sample keys to correct
+
+    Returns:
+        callable: hook(sample) -> sample
+    """
+    def hook(sample):
+        rh = sample.get('humidity')
+        if rh is None or rh <= 0:
+            return sample
+        rh = min(rh, 95) / 100
+        growth = 1 + (kappa / 1.65) / (1 / rh - 1)
+        for ch in channels:
+            if sample.get(ch) is not None:
+                sample[ch] = sample[ch] / growth
+        return sample
+    return hook
+
+
+def temperature_offset_correction(offset, channel='temperature'):
+    """
+    Build a hook that subtracts a fixed offset, e.g. for a sensor that is
+    warmed by the Pi it is mounted next to
+
+    Returns:
+        callable: hook(sample) -> sample
+    """
+    def hook(sample):
+        if sample.get(channel) is not None:
+            sample[channel] = sample[channel] - offset
+        return sample
+    return hook
+
+
+PRESETS = ('none', 'hampel', 'median', 'ema', 'smooth')
+
+
+class FilterPipeline:
+    """Applies correction hooks and per-channel filter chains to each sample"""
+
+    def __init__(self, stages=None, corrections=None):
+        """
+        Args:
+            stages: Dict of channel -> list of filter factories, e.g.
+                    {'pm25': [lambda: Hampel(7), lambda: EMA(0.3)]}.
+                    Factories are used so every channel gets its own state.
+            corrections: List of hook(sample) -> sample, run before filtering
+        """
+        self.stages = stages or {}
+        self.corrections = corrections or []
+        self._filters = {ch: [make() for make in chain] for ch, chain in self.stages.items()}
+
+    def process(self, sample):
+        """
+        Filter one sample
+
+        Args:
+            sample: Dict of channel values (None values are left alone)
+
+        Returns:
+            dict: New sample with filtered values; the input is not modified
+        """
+        out = dict(sample)
+        for hook in self.corrections:
+            out = hook(out)
+        for ch, chain in self._filters.items():
+            value = out.get(ch)
+            if value is None:
+                continue
+            for f in chain:
+                value = f.update(value)
+            out[ch] = value
+        return out
+
+
+def create_pipeline(preset='hampel', channels=('pm1', 'pm25', 'pm10', 'co2'), corrections=None):
+    """
+    Build a pipeline from a preset name
+
+    Args:
+        preset: 'none', 'hampel' (outlier rejection only), 'median',
+                'ema', or 'smooth' (Hampel, then median, then EMA)
+        channels: Sample keys to filter
+        corrections: Correction hooks (see kohler_humidity_correction)
+
+    Returns:
+        FilterPipeline
+    """
+    chains = {
+        'none': [],
+        'hampel': [lambda: Hampel(7)],
+        'median': [lambda: RollingMedian(5)],
+        'ema': [lambda: EMA(0.3)],
+        'smooth': [lambda: Hampel(7), lambda: RollingMedian(5), lambda: EMA(0.3)],
+    }
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown filter preset: {preset}")
+    chain = chains[preset]
+    return FilterPipeline({ch: chain for ch in channels} if chain else {}, corrections)
+
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Load protection for the AirIQ dashboard server
+Single-flight coalescing shares one computation between concurrent
+identical requests, and per-client token buckets cap how fast any one
+client can call the API.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time
+
+    Callers that arrive while a computation for their key is in flight
+    wait for it and get the same result (or exception) instead of
+    starting their own. Nothing is cached once the computation ends.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        """
+        Return fn(), sharing the call with concurrent callers of the same key
+
+        Args:
+            key: Hashable identity of the computation
+            fn: Callable with no arguments
+
+        Returns:
+            Result of fn()
+        """
+        with self.lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                call['result'] = fn()
+            except Exception as e:
+                call['error'] = e
+            finally:
+                with self.lock:
+                    del self._calls[key]
+                call['done'].set()
+        else:
+            call['done'].wait()
+
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, with bursts up to `burst`"""
+
+    # One bucket is kept per client, so keep them small
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket size (the largest burst allowed)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        """
+        Take one token if available
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket per client, keeping at most `max_clients` buckets"""
+
+    def __init__(self, rate=5, burst=20, max_clients=1024):
+        """
+        Args:
+            rate: Requests per second allowed per client
+            burst: Requests a client may make at once (a page load fetches several)
+            max_clients: Buckets kept; the least recently seen client is forgotten first
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.limited = 0
+
+    def check(self, client):
+        """
+        Count one request from a client
+
+        Args:
+            client: Client identity, e.g. the IP address
+
+        Returns:
+            int: 0 if allowed, otherwise the Retry-After delay in whole seconds
+        """
+        with self.lock:
+            bucket = self._buckets.pop(client, None) or TokenBucket(self.rate, self.burst)
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            wait = bucket.take()
+            if wait:
+                self.limited += 1
+        return math.ceil(wait)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Memory watchdog for AirIQ on small boards
+Polls the resident set size and, when it nears a ceiling, drops caches and
+hands freed memory back to the OS. While RSS stays above the ceiling the
+server refuses its heaviest endpoints instead of growing further.
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import threading
+import time
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'))
+    _malloc_trim = _libc.malloc_trim
+except (OSError, AttributeError, TypeError):
+    _malloc_trim = None  # not glibc
+
+
+def rss_kb(pid='self'):
+    """
+    Read resident set size of a process from /proc
+
+    Args:
+        pid: Process id, or 'self'
+
+    Returns:
+        int: RSS in kB, or None if unavailable
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def release():
+    """Run the garbage collector and return free heap pages to the OS"""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+class MemoryWatchdog:
+    """
+    Sheds caches when RSS crosses a fraction of the ceiling
+
+    Both thresholds have hysteresis. After a shed, RSS has to grow by
+    `rearm` of the ceiling before caches are shed again, so a baseline that
+    stays above the soft threshold is not shed every interval. Once over
+    the ceiling, RSS has to fall below `resume` of it before the heavy
+    endpoints come back.
+    """
+
+    def __init__(self, limit_mb, shedders=(), soft=0.8, resume=0.9, rearm=0.05, interval=5):
+        """
+        Args:
+            limit_mb: RSS ceiling in MB
+            shedders: Callables that drop a cache, e.g. HistoryCache.clear
+            soft: Fraction of the ceiling at which caches are shed
+            resume: Fraction of the ceiling below which `critical` clears
+            rearm: Fraction of the ceiling RSS must grow by after a shed
+                   before the next one
+            interval: Seconds between checks
+        """
+        self.limit_kb = limit_mb * 1024
+        self.shedders = list(shedders)
+        self.soft = soft
+        self.resume = resume
+        self.rearm = rearm
+        self.interval = interval
+        self.rss = rss_kb()
+        self.peak = self.rss or 0
+        self.sheds = 0
+        self.critical = False
+        self._shed_at = None  # RSS after the last shed, while above soft
+
+    def check(self):
+        """
+        Measure RSS once and shed if needed
+
+        Returns:
+            int: RSS in kB after any shedding
+        """
+        rss = rss_kb()
+        if rss is None:
+            return None
+        self.peak = max(self.peak, rss)
+        if rss <= self.limit_kb * self.soft:
+            self._shed_at = None
+        elif self._shed_at is None or rss > self._shed_at + self.limit_kb * self.rearm:
+            for shed in self.shedders:
+                shed()
+            release()
+            self.sheds += 1
+            rss = rss_kb()
+            self._shed_at = rss
+        self.rss = rss
+        if rss > self.limit_kb:
+            self.critical = True
+        elif rss < self.limit_kb * self.resume:
+            self.critical = False
+        return rss
+
+    def _run(self):
+        """Watchdog thread"""
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def start(self):
+        """Check in a daemon thread every `interval` seconds"""
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def status(self):
+        """Memory state for the API"""
+        return {'rss_kb': self.rss, 'peak_kb': self.peak, 'limit_kb': self.limit_kb,
+                'sheds': self.sheds, 'critical': self.critical}
@@ -125,13 +125,15 @@ class MHZ19C:
             print(f"Error reading data: {e}")
             return None
     
-    def read_continuous(self, interval=5, duration=None):
+    def read_continuous(self, interval=5, duration=None, pipeline=None):
         """
         Read CO2 data continuously from sensor
         
         Args:
             interval: Time between readings in seconds (minimum 5 seconds recommended)
             duration: Total duration to read in seconds (None = infinite)
+            pipeline: Optional filters.FilterPipeline, e.g.
+                      create_pipeline('median', channels=('co2',))
         """
         if interval < 5:
             print("Warning: Reading interval less than 5 seconds may affect sensor accuracy")
@@ -142,10 +144,13 @@ class MHZ19C:
             while True:
                 data = self.read_co2()
                 
+                if data and pipeline:
+                    data = pipeline.process(data)
+                
                 if data:
                     co2_level = self.get_co2_level(data['co2'])
                     print(f"\n[{data['timestamp']}]")
-                    print(f"CO2:         {data['co2']} ppm")
+                    print(f"CO2:         {data['co2']:g} ppm")
                     print(f"Temperature: {data['temperature']}°C")
                     print(f"Level:       {co2_level}")
                 else:
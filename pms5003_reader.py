@@ -15,6 +15,14 @@ class PMS5003:
     START_BYTE_1 = 0x42
     START_BYTE_2 = 0x4d
     
+    # Host commands (frame: start bytes, command, 2 data bytes, checksum)
+    CMD_MODE = 0xe1     # data 0 = passive, 1 = active
+    CMD_READ = 0xe2     # request one frame in passive mode
+    CMD_SLEEP = 0xe4    # data 0 = sleep, 1 = wake up
+    
+    # Seconds the fan needs after waking before readings are stable (datasheet)
+    WAKE_UP_TIME = 30
+    
     def __init__(self, port='/dev/ttyS0', baudrate=9600, timeout=2):
         """
         Initialize PMS5003 sensor
@@ -28,6 +36,7 @@ class PMS5003:
         self.baudrate = baudrate
         self.timeout = timeout
         self.serial = None
+        self.passive = False
         
     def connect(self):
         """Open serial connection to the sensor"""
@@ -50,6 +59,29 @@ class PMS5003:
             self.serial.close()
             print("Disconnected from sensor")
     
+    def _command(self, cmd, data=0):
+        """Send a host command frame to the sensor"""
+        frame = bytes([self.START_BYTE_1, self.START_BYTE_2, cmd, 0, data])
+        self.serial.write(frame + struct.pack('>H', sum(frame)))
+    
+    def set_passive(self, passive=True):
+        """
+        Switch between passive mode (one frame per request) and active mode
+        (the sensor streams frames on its own)
+        """
+        self._command(self.CMD_MODE, 0 if passive else 1)
+        self.passive = passive
+        time.sleep(0.1)
+        self.serial.reset_input_buffer()  # drop the command reply
+    
+    def sleep(self):
+        """Stop the fan and laser until wake() is called"""
+        self._command(self.CMD_SLEEP, 0)
+    
+    def wake(self):
+        """Start the fan and laser; readings settle after WAKE_UP_TIME seconds"""
+        self._command(self.CMD_SLEEP, 1)
+    
     def read_data(self):
         """
         Read and parse data from PMS5003 sensor
@@ -62,6 +94,11 @@ class PMS5003:
             return None
         
         try:
+            if self.passive:
+                # Ask for a fresh frame instead of reading a buffered one
+                self.serial.reset_input_buffer()
+                self._command(self.CMD_READ)
+            
             # Read until we find the start bytes
             while True:
                 byte1 = self.serial.read(1)
@@ -114,13 +151,15 @@ class PMS5003:
             print(f"Error reading data: {e}")
             return None
     
-    def read_continuous(self, interval=1, duration=None):
+    def read_continuous(self, interval=1, duration=None, pipeline=None):
         """
         Read data continuously from sensor
         
         Args:
             interval: Time between readings in seconds
             duration: Total duration to read in seconds (None = infinite)
+            pipeline: Optional filters.FilterPipeline, e.g.
+                      create_pipeline('median', channels=('pm1_atm', 'pm25_atm', 'pm10_atm'))
         """
         start_time = time.time()
         
@@ -128,11 +167,14 @@ class PMS5003:
             while True:
                 data = self.read_data()
                 
+                if data and pipeline:
+                    data = pipeline.process(data)
+                
                 if data:
                     print(f"\n[{data['timestamp']}]")
-                    print(f"PM1.0:  {data['pm1_atm']} µg/m³")
-                    print(f"PM2.5:  {data['pm25_atm']} µg/m³")
-                    print(f"PM10:   {data['pm10_atm']} µg/m³")
+                    print(f"PM1.0:  {data['pm1_atm']:g} µg/m³")
+                    print(f"PM2.5:  {data['pm25_atm']:g} µg/m³")
+                    print(f"PM10:   {data['pm10_atm']:g} µg/m³")
                 else:
                     print("Failed to read data")
                 
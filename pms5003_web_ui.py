@@ -2,121 +2,21 @@
 """
 PMS5003 Air Quality Monitor with Web UI
 Displays real-time PM sensor data in a web browser
-"""
-
-from flask import Flask, render_template, jsonify
-from pms5003_reader import PMS5003
-import threading
-import time
-
-app = Flask(__name__)
-
-# Global variables to store sensor data
-sensor_data = {
-    'pm1_atm': 0,
-    'pm25_atm': 0,
-    'pm10_atm': 0,
-    'timestamp': '',
-    'connected': False,
-    'error': None
-}
 
-# Sensor instance
-sensor = None
-sensor_lock = threading.Lock()
-
-def get_air_quality_level(pm25):
-    """Get air quality level based on PM2.5"""
-    if pm25 <= 12:
-        return {'level': 'Good', 'color': '#00e400', 'description': 'Air quality is satisfactory'}
-    elif pm25 <= 35:
-        return {'level': 'Moderate', 'color': '#ffff00', 'description': 'Air quality is acceptable'}
-    elif pm25 <= 55:
-        return {'level': 'Unhealthy for Sensitive Groups', 'color': '#ff7e00', 'description': 'Sensitive groups may experience health effects'}
-    elif pm25 <= 150:
-        return {'level': 'Unhealthy', 'color': '#ff0000', 'description': 'Everyone may begin to experience health effects'}
-    elif pm25 <= 250:
-        return {'level': 'Very Unhealthy', 'color': '#8f3f97', 'description': 'Health alert: everyone may experience serious effects'}
-    else:
-        return {'level': 'Hazardous', 'color': '#7e0023', 'description': 'Health warnings of emergency conditions'}
+This used to be a separate Flask app with its own in-memory state. It now
+starts the shared dashboard server from run_server.py with the real sensor
+as data source, so there is a single engine, cache and database.
+"""
 
-def read_sensor_loop():
-    """Background thread to continuously read sensor data"""
-    global sensor_data, sensor
-    
-    sensor = PMS5003(port='/dev/ttyS0', baudrate=9600)
-    
-    if not sensor.connect():
-        with sensor_lock:
-            sensor_data['connected'] = False
-            sensor_data['error'] = 'Failed to connect to sensor'
-        return
-    
-    with sensor_lock:
-        sensor_data['connected'] = True
-        sensor_data['error'] = None
-    
-    print("Sensor connected, starting data collection...")
-    
-    while True:
-        try:
-            data = sensor.read_data()
-            
-            if data:
-                with sensor_lock:
-                    sensor_data.update({
-                        'pm1_atm': data['pm1_atm'],
-                        'pm25_atm': data['pm25_atm'],
-                        'pm10_atm': data['pm10_atm'],
-                        'timestamp': data['timestamp'],
-                        'connected': True,
-                        'error': None
-                    })
-            else:
-                with sensor_lock:
-                    sensor_data['error'] = 'Failed to read data'
-            
-            time.sleep(2)  # Read every 2 seconds
-            
-        except Exception as e:
-            with sensor_lock:
-                sensor_data['error'] = str(e)
-                sensor_data['connected'] = False
-            time.sleep(5)
+import sys
 
-@app.route('/')
-def index():
-    """Serve the main page"""
-    return render_template('index.html')
+from air_quality import get_air_quality_level  # noqa: F401 (kept for existing imports)
+import run_server
 
-@app.route('/api/data')
-def get_data():
-    """API endpoint to get current sensor data"""
-    with sensor_lock:
-        data = sensor_data.copy()
-    
-    # Add air quality level
-    aqi = get_air_quality_level(data['pm25_atm'])
-    data['aqi'] = aqi
-    
-    return jsonify(data)
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
 
-@app.route('/api/status')
-def get_status():
-    """API endpoint to get sensor status"""
-    with sensor_lock:
-        return jsonify({
-            'connected': sensor_data['connected'],
-            'error': sensor_data['error']
-        })
+    print(f"Starting web server on http://0.0.0.0:{port}")
+    print(f"Open your browser and navigate to http://<raspberry-pi-ip>:{port}")
 
-if __name__ == '__main__':
-    # Start sensor reading in background thread
-    sensor_thread = threading.Thread(target=read_sensor_loop, daemon=True)
-    sensor_thread.start()
-    
-    print("Starting web server on http://0.0.0.0:5000")
-    print("Open your browser and navigate to http://<raspberry-pi-ip>:5000")
-    
-    # Run Flask app
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    run_server.run(port=port, source='sensor')
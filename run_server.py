@@ -1,36 +1,406 @@
 #!/usr/bin/env python3
 """
-AirIQ PMS5003 Web Dashboard Server
-Simple HTTP server for real-time air quality monitoring with SQLite storage
+AirIQ Web Dashboard Server
+Single HTTP server for real-time air quality monitoring with SQLite storage.
+A background thread samples a data source (real PMS5003/MH-Z19C or the
+simulator) into a shared cache and the database; requests only read.
 """
-from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
-import json
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import argparse
 import os
+import queue
+import socket
 import urllib.parse
+import threading
 import time
 import mimetypes
-import sys
-import random
 from datetime import datetime
+from itertools import chain
 
-from db import insert_reading, get_latest_reading, get_history_24h, get_all_records
+from db import (insert_reading, get_latest_reading, get_all_rows, iter_all_rows, query, plan_query,
+                parse_time, parse_duration, QueryError)
+from air_quality import get_air_quality_level
+from alerts import AlertEngine
+from filters import create_pipeline, PRESETS
+from limits import SingleFlight, RateLimiter
+from memory import MemoryWatchdog, rss_kb
+from sampling import AdaptiveScheduler
+from export import export, check_options, filename, CONTENT_TYPES, ExportError
+from serialize import dumps, encode_rows, iter_encode, HistoryCache, FORMATS
+from sources import create_source, SCENARIOS
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 TEMPLATES = os.path.join(ROOT, 'templates')
 
+# Latest reading shared between the sampler thread and request handlers
+sensor_data = {
+    'pm1': 0,
+    'pm25': 0,
+    'pm10': 0,
+    'co2': None,
+    'timestamp': '',
+    'source': None,
+    'connected': False,
+    'error': None
+}
+sensor_lock = threading.Lock()
+
+# Caps on threads and caches. 'low-memory' suits a 512 MB Pi Zero 2
+# that also runs other services.
+PROFILES = {
+    'default': {'workers': 8, 'clients': 1024, 'cache_bytes': None,
+                'alert_history': 100, 'chunk_rows': 50000, 'stream_all': False, 'binary_export': True,
+                'rss_limit_mb': None},
+    'low-memory': {'workers': 2, 'clients': 128, 'cache_bytes': 2 * 1024 * 1024,
+                   'alert_history': 20, 'chunk_rows': 2000, 'stream_all': True, 'binary_export': False,
+                   'rss_limit_mb': 48},
+}
+profile = PROFILES['default']
+
+history_cache = HistoryCache(hours=24)
+alert_engine = AlertEngine()
+scheduler = None
+# Concurrent identical history requests share one computation
+flights = SingleFlight()
+rate_limiter = RateLimiter()
+watchdog = None
+
+
+def get_current():
+    """
+    Snapshot of the latest reading for the API
+
+    Returns:
+        dict: Current values plus AQI level; the ``*_atm`` keys keep the
+              response compatible with clients of the old Flask UI
+    """
+    with sensor_lock:
+        data = sensor_data.copy()
+    data['pm1_atm'] = data['pm1']
+    data['pm25_atm'] = data['pm25']
+    data['pm10_atm'] = data['pm10']
+    data['aqi'] = get_air_quality_level(data['pm25'])
+    return data
+
+
+def sample_loop(source, interval=2, pipeline=None, store_raw=False, scheduler=None):
+    """
+    Background thread to read the data source and store each sample
+
+    Args:
+        source: Data source from sources.create_source()
+        interval: Time between readings in seconds
+        pipeline: filters.FilterPipeline applied before storage and alerts
+        store_raw: Also store the unfiltered values
+        scheduler: sampling.AdaptiveScheduler that sets the time between
+                   readings instead of `interval`
+    """
+    with sensor_lock:
+        sensor_data['source'] = source.name
+
+    if not source.connect():
+        with sensor_lock:
+            sensor_data['connected'] = False
+            sensor_data['error'] = 'Failed to connect to sensor'
+        return
+
+    # Seed the cache so the dashboard has values before the first sample
+    last = get_latest_reading()
+    with sensor_lock:
+        if last:
+            sensor_data.update(last)
+        sensor_data['connected'] = True
+        sensor_data['error'] = None
+
+    while True:
+        try:
+            raw = source.read()
+
+            if raw:
+                data = pipeline.process(raw) if pipeline else raw
+                insert_reading(data['pm1'], data['pm25'], data['pm10'], data['co2'],
+                               (raw['pm1'], raw['pm25'], raw['pm10'], raw['co2']) if store_raw else None)
+                with sensor_lock:
+                    sensor_data.update(data)
+                    sensor_data['connected'] = True
+                    sensor_data['error'] = None
+                print(f"[{data['timestamp']}] Saved: PM1.0={data['pm1']:.1f}, "
+                      f"PM2.5={data['pm25']:.1f}, PM10={data['pm10']:.1f}")
+                for event in alert_engine.process(data):
+                    print(f"[{data['timestamp']}] Alert {event['name']} {event['state']} "
+                          f"(value {event['value']:.1f})")
+                if scheduler:
+                    # Decide on raw values, so the filter cannot hide the start of an event
+                    scheduler.update(raw)
+            else:
+                with sensor_lock:
+                    sensor_data['error'] = 'Failed to read data'
+                if scheduler:
+                    scheduler.failed()
+
+            if scheduler:
+                scheduler.wait(source)
+            else:
+                time.sleep(interval)
+
+        except Exception as e:
+            with sensor_lock:
+                sensor_data['error'] = str(e)
+                sensor_data['connected'] = False
+            time.sleep(5)
+
+
+class DashboardServer(HTTPServer):
+    """
+    HTTP server with a fixed pool of worker threads
+
+    Accepted connections wait in a queue for a worker. Admission goes by
+    how long a connection has waited, not how many are waiting: a burst
+    of quick or coalesced requests drains fast however large it is, and
+    only an API request that waited more than `max_wait` seconds (or a
+    connection that finds the queue full) gets 503 with Retry-After. The
+    page and static files are always served. An overload sheds requests
+    instead of starting a thread for each one.
+    """
+    # Listen backlog, and the most connections that may wait for a worker:
+    # room for a burst of page reloads, so connections are not dropped (and
+    # retried a second later) before they can be served or refused
+    request_queue_size = 256
+
+    # Seconds a connection may wait for a worker before it is refused
+    max_wait = 5
+
+    BUSY = (b'HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\n'
+            b'Content-Type: application/json\r\nContent-Length: 26\r\n\r\n'
+            b'{"error": "Server busy"}\r\n')
+
+    def __init__(self, address, handler, workers=8):
+        """
+        Args:
+            address: (host, port) to listen on
+            handler: Request handler class
+            workers: Threads serving requests
+        """
+        super().__init__(address, handler)
+        self.workers = workers
+        self.pending = queue.Queue(self.request_queue_size)
+        self.rejected = 0
+        # Long downloads (/api/export, /api/db/all) may hold all but one worker
+        self.downloads = threading.BoundedSemaphore(max(1, workers - 1))
+        self.downloads_refused = 0
+        self.lock = threading.Lock()
+        for _ in range(workers):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        """Worker thread: serve queued connections one at a time"""
+        while True:
+            request, client_address, queued = self.pending.get()
+            if time.monotonic() - queued > self.max_wait and self._is_api(request):
+                self._refuse(request)
+                continue
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        """Queue a connection for the workers, or refuse it if the queue is full"""
+        try:
+            self.pending.put_nowait((request, client_address, time.monotonic()))
+        except queue.Full:
+            self._refuse(request)
+
+    @staticmethod
+    def _is_api(request):
+        """Whether a connection asks for /api/ (the page and static files are cheap)"""
+        try:
+            request.setblocking(False)
+            line = request.recv(64, socket.MSG_PEEK)
+        except OSError:
+            return True
+        finally:
+            request.setblocking(True)
+        return b' /api/' in line
+
+    def _refuse(self, request):
+        """Answer 503 Server busy without reading the request, and close"""
+        self.rejected += 1
+        try:
+            # Read what the client already sent, so closing does not reset
+            # the connection before it sees the response
+            request.setblocking(False)
+            request.recv(65536)
+        except OSError:
+            pass
+        try:
+            request.setblocking(True)
+            request.sendall(self.BUSY)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def status(self):
+        """Load counters for the API"""
+        return {'workers': self.workers, 'queued': self.pending.qsize(), 'rejected': self.rejected,
+                'downloads_refused': self.downloads_refused,
+                'rate_limited': rate_limiter.limited if rate_limiter else 0,
+                'coalesced': flights.shared}
+
+
+def apply_profile(name='default', workers=None, rate_limit=5, burst=20, rss_limit_mb=None):
+    """
+    Size the shared caches, limits and memory watchdog
+
+    Args:
+        name: Key of PROFILES
+        workers: Override the profile's worker thread count
+        rate_limit: API requests per second per client (0 = unlimited)
+        burst: API requests a client may make at once
+        rss_limit_mb: Override the profile's RSS ceiling (None = profile's)
+
+    Returns:
+        dict: The profile in effect
+    """
+    global profile, history_cache, alert_engine, rate_limiter, watchdog
+    profile = dict(PROFILES[name])
+    if workers:
+        profile['workers'] = workers
+    if rss_limit_mb:
+        profile['rss_limit_mb'] = rss_limit_mb
+
+    history_cache = HistoryCache(hours=24, max_bytes=profile['cache_bytes'])
+    alert_engine = AlertEngine(history=profile['alert_history'])
+    rate_limiter = RateLimiter(rate_limit, burst, profile['clients']) if rate_limit else None
+    watchdog = None
+    if profile['rss_limit_mb']:
+        watchdog = MemoryWatchdog(profile['rss_limit_mb'], [history_cache.clear])
+        watchdog.start()
+    return profile
+
+
 class DashboardHandler(BaseHTTPRequestHandler):
     """HTTP request handler for dashboard and API endpoints"""
 
-    def send_json(self, obj, status=200):
+    # Seconds a silent client may hold a worker
+    timeout = 30
+
+    def send_json(self, obj, status=200, headers=None):
         """Send JSON response"""
-        data = json.dumps(obj).encode('utf-8')
+        self.send_json_bytes(dumps(obj), status, headers)
+
+    def send_json_bytes(self, data, status=200, headers=None):
+        """Send an already encoded JSON response"""
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', str(len(data)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(data)
 
+    def send_json_stream(self, chunks):
+        """Send a JSON response piece by piece, without Content-Length"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+    def send_range(self, params, fmt):
+        """
+        Stream a time-range history query
+        (/api/history?from=-7d&to=now&step=15m&agg=avg&channels=pm25,pm10)
+        """
+        try:
+            now = datetime.now()
+            start = parse_time(params.get('from', ['-24h'])[0], now)
+            end = parse_time(params.get('to', ['now'])[0], now)
+            step = parse_duration(params['step'][0]) if 'step' in params else None
+            channels = tuple(params.get('channels', ['pm25,pm10'])[0].split(','))
+            agg = params.get('agg', ['avg'])[0]
+            plan = plan_query(start, end, channels, step, agg)
+            rows = query(start, end, channels, plan=plan)
+            # Pull the first row here so budget errors can still become a 400
+            first = next(rows, None)
+        except QueryError as e:
+            return self.send_json({'error': str(e)}, 400)
+
+        rows = chain([first], rows) if first is not None else iter(())
+        head = {'current': get_current(), 'step': plan['step'], 'source': plan['source']}
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(dumps(head)[:-1] + b',"history":')
+        try:
+            for chunk in iter_encode(('time',) + channels, rows, fmt):
+                self.wfile.write(chunk)
+        except QueryError as e:
+            # Headers are already sent; closing the connection is all we can do
+            print(f"History query aborted: {e}")
+            return
+        self.wfile.write(b'}')
+
+    def send_export(self, params):
+        """Stream an export file; rows are read and written in chunks"""
+        try:
+            fmt = params.get('format', ['csv'])[0]
+            compress = params.get('compress', [None])[0]
+            channels = tuple(params.get('channels', ['pm1,pm25,pm10,co2'])[0].split(','))
+            # Importing pyarrow alone costs tens of MB that are never given back
+            if fmt != 'csv' and not profile['binary_export']:
+                raise ExportError(f"{fmt} export is disabled in this profile (use format=csv)")
+            check_options(fmt, compress, channels)
+            now = datetime.now()
+            start = parse_time(params['from'][0], now) if 'from' in params else None
+            end = parse_time(params['to'][0], now) if 'to' in params else None
+        except (ExportError, QueryError) as e:
+            return self.send_json({'error': str(e)}, 400)
+
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[fmt])
+        self.send_header('Content-Disposition', f'attachment; filename="{filename(fmt, compress)}"')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        export(self.wfile, fmt, start, end, channels, compress, profile['chunk_rows'])
+
+    def send_all_records(self, fmt):
+        """Send every reading, streamed from the cursor in the low-memory profile"""
+        if profile['stream_all']:
+            # Columnar output cannot be closed until every row is read
+            if fmt == 'columnar':
+                return self.send_json({'error': 'columnar is disabled for /api/db/all in this '
+                                                'profile (use format=rows)'}, 400)
+            columns = ('timestamp', 'pm1', 'pm25', 'pm10')
+            return self.send_json_stream(chain(
+                [b'{"records":'], iter_encode(columns, iter_all_rows(profile['chunk_rows']), fmt), [b'}']))
+        records = flights.do(('db/all', fmt), lambda: encode_rows(
+            ('timestamp', 'pm1', 'pm25', 'pm10'), get_all_rows(), fmt))
+        return self.send_json_bytes(b'{"records":' + records + b'}')
+
+    def send_download(self, send, *args):
+        """
+        Run a whole-table response, at most workers - 1 at a time
+
+        A download holds its worker for as long as the client takes to read
+        it, so one worker is always left for the dashboard. Beyond the cap
+        the client gets 503 with Retry-After.
+        """
+        if not self.server.downloads.acquire(blocking=False):
+            with self.server.lock:
+                self.server.downloads_refused += 1
+            return self.send_json({'error': 'Too many downloads in progress'}, 503, {'Retry-After': '5'})
+        try:
+            return send(*args)
+        finally:
+            self.server.downloads.release()
+
     def serve_file(self, fullpath):
         """Serve static file"""
         if not os.path.exists(fullpath) or not os.path.isfile(fullpath):
@@ -49,6 +419,18 @@ class DashboardHandler(BaseHTTPRequestHandler):
         """Handle GET requests"""
         parsed = urllib.parse.urlparse(self.path)
         p = parsed.path
+        params = urllib.parse.parse_qs(parsed.query)
+        fmt = params.get('format', ['rows'])[0]
+        if p.startswith('/api/') and rate_limiter:
+            wait = rate_limiter.check(self.client_address[0])
+            if wait:
+                return self.send_json({'error': 'Too many requests'}, 429, {'Retry-After': str(wait)})
+        if p.startswith('/api/') and p != '/api/export' and fmt not in FORMATS:
+            return self.send_json({'error': f"Unknown format: {fmt}"}, 400)
+        # Over the memory ceiling, refuse the requests that read whole tables
+        heavy = p in ('/api/db/all', '/api/export') or (p == '/api/history' and 'from' in params)
+        if heavy and watchdog and watchdog.critical:
+            return self.send_json({'error': 'Low on memory'}, 503, {'Retry-After': '5'})
 
         # Serve main dashboard
         if p in ('/', '/index.html'):
@@ -67,55 +449,40 @@ class DashboardHandler(BaseHTTPRequestHandler):
 
         # API: Current sensor data
         if p == '/api/data':
-            # Generate random sensor reading
-            pm1 = 2.5 + random.uniform(-0.5, 1.0)
-            pm25 = 10 + random.uniform(-2, 5)
-            pm10 = 16 + random.uniform(-3, 8)
-            
-            # Save to database
-            insert_reading(pm1, pm25, pm10)
-            
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            obj = {
-                'connected': True,
-                'pm1': pm1,
-                'pm25': pm25,
-                'pm10': pm10,
-                'timestamp': now
-            }
-            print(f"[{now}] Saved: PM1.0={pm1:.1f}, PM2.5={pm25:.1f}, PM10={pm10:.1f}")
-            return self.send_json(obj)
-
-        # API: Historical data for chart
+            return self.send_json(get_current())
+
+        # API: Sensor status
+        if p == '/api/status':
+            # Copy under the lock; the sampler thread waits on it
+            with sensor_lock:
+                status = {key: sensor_data[key] for key in ('connected', 'error', 'source')}
+            status.update({
+                'alerts': alert_engine.active(),
+                'sampling': scheduler.status() if scheduler else {'interval': None, 'reason': 'fixed'},
+                'load': self.server.status(),
+                'memory': watchdog.status() if watchdog else {'rss_kb': rss_kb()}
+            })
+            return self.send_json(status)
+
+        # API: Alert states and recent raise/clear events
+        if p == '/api/alerts':
+            return self.send_json(alert_engine.status())
+
+        # API: Historical data for chart (?format=columnar for column arrays)
         if p == '/api/history':
-            # Generate random sensor reading
-            pm1 = 2.5 + random.uniform(-0.5, 1.0)
-            pm25 = 10 + random.uniform(-2, 5)
-            pm10 = 16 + random.uniform(-3, 8)
-            
-            # Save to database first
-            insert_reading(pm1, pm25, pm10)
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Saved: PM1.0={pm1:.1f}, PM2.5={pm25:.1f}, PM10={pm10:.1f}")
-            
-            # Get 24h history from database
-            history = get_history_24h()
-            
-            obj = {
-                'current': {
-                    'pm1': pm1,
-                    'pm25': pm25,
-                    'pm10': pm10,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                },
-                'history': history
-            }
-            
-            return self.send_json(obj)
+            if any(k in params for k in ('from', 'to', 'step', 'agg', 'channels')):
+                return self.send_range(params, fmt)
+            history = flights.do(('history', fmt), lambda: history_cache.encode(fmt))
+            return self.send_json_bytes(
+                b'{"current":' + dumps(get_current()) + b',"history":' + history + b'}')
 
         # API: All database records
         if p == '/api/db/all':
-            records = get_all_records()
-            return self.send_json({'records': records})
+            return self.send_download(self.send_all_records, fmt)
+
+        # API: Bulk export (?format=csv|parquet|arrow&from=&to=&channels=&compress=)
+        if p == '/api/export':
+            return self.send_download(self.send_export, params)
 
         # Try to serve other files
         local = os.path.join(ROOT, p.lstrip('/'))
@@ -129,18 +496,98 @@ class DashboardHandler(BaseHTTPRequestHandler):
         pass
 
 
-def run(port=8000):
-    """Start the server"""
-    server = ThreadingHTTPServer(('0.0.0.0', port), DashboardHandler)
-    print(f"✓ AirIQ Dashboard running at http://localhost:{port}")
+def run(port=8000, source='simulator', interval=2, pm_port='/dev/ttyS0', co2_port=None,
+        filter_preset='hampel', store_raw=False, adaptive=False, max_interval=120, scenario='noise',
+        workers=None, rate_limit=5, burst=20, profile_name='default', rss_limit_mb=None):
+    """
+    Start the sampler thread and the server
+
+    Args:
+        port: HTTP port to listen on
+        source: 'sensor' for real hardware, 'simulator' for mock data
+        interval: Seconds between samples
+        pm_port: Serial port of the PMS5003 (sensor source only)
+        co2_port: Serial port of the MH-Z19C (sensor source only, optional)
+        filter_preset: Filter applied before storage (see filters.PRESETS)
+        store_raw: Also store unfiltered values in the *_raw columns
+        adaptive: Vary the sample rate with the air (interval is the fastest
+                  rate) and sleep the PMS5003 between sparse samples
+        max_interval: Longest gap between samples in adaptive mode
+        scenario: Simulator scenario (see sources.SCENARIOS)
+        workers: Threads serving requests; extra requests queue, and get 503
+                 once they have waited DashboardServer.max_wait seconds
+                 (None = the profile's)
+        rate_limit: API requests per second per client (0 = unlimited)
+        burst: API requests a client may make at once
+        profile_name: Resource profile (see PROFILES)
+        rss_limit_mb: RSS ceiling for the memory watchdog (None = the profile's)
+    """
+    global scheduler
+    caps = apply_profile(profile_name, workers, rate_limit, burst, rss_limit_mb)
+    if source == 'sensor':
+        kwargs = {'pm_port': pm_port, 'co2_port': co2_port, 'passive': adaptive}
+    else:
+        kwargs = {'scenario': scenario}
+    data_source = create_source(source, **kwargs)
+    pipeline = create_pipeline(filter_preset)
+    if adaptive:
+        scheduler = AdaptiveScheduler(min_interval=interval, max_interval=max_interval)
+
+    sampler = threading.Thread(target=sample_loop,
+                               args=(data_source, interval, pipeline, store_raw, scheduler),
+                               daemon=True)
+    sampler.start()
+
+    server = DashboardServer(('0.0.0.0', port), DashboardHandler, caps['workers'])
+    print(f"✓ AirIQ Dashboard running at http://localhost:{port} (source: {source}, profile: {profile_name})")
     print(f"✓ Press Ctrl-C to stop\n")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print('\n✓ Server stopped')
-        server.shutdown()
+        server.server_close()
+        data_source.disconnect()
+
+
+def main():
+    """Parse command line and start the server"""
+    parser = argparse.ArgumentParser(description='AirIQ dashboard server')
+    parser.add_argument('port', nargs='?', type=int, default=8000, help='HTTP port (default: 8000)')
+    parser.add_argument('--source', choices=['sensor', 'simulator'], default='simulator',
+                        help='Where readings come from (default: simulator)')
+    parser.add_argument('--interval', type=float, default=2,
+                        help='Seconds between samples (fastest rate with --adaptive)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Sample fast only while the air changes; sleep the sensor otherwise')
+    parser.add_argument('--max-interval', type=float, default=120,
+                        help='Longest gap between samples with --adaptive (default: 120; '
+                             'longer gaps save sensor wear but can miss short AQI episodes)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default',
+                        help='Resource caps: default, or low-memory for 512 MB boards')
+    parser.add_argument('--rss-limit', type=int, default=None,
+                        help='RSS ceiling in MB; caches are shed near it (low-memory default: 48)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Request threads; overflow waits up to 5 s, then gets 503 '
+                             '(default: 8, low-memory: 2)')
+    parser.add_argument('--rate-limit', type=float, default=5,
+                        help='API requests per second per client, 0 = off (default: 5)')
+    parser.add_argument('--burst', type=int, default=20,
+                        help='API requests a client may make at once (default: 20)')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='noise',
+                        help='Simulator data (default: noise; daily has quiet hours and cooking events)')
+    parser.add_argument('--pm-port', default='/dev/ttyS0', help='PMS5003 serial port')
+    parser.add_argument('--co2-port', default=None, help='MH-Z19C serial port (optional)')
+    parser.add_argument('--filter', choices=PRESETS, default='hampel',
+                        help='Filter applied before storage (default: hampel outlier rejection)')
+    parser.add_argument('--store-raw', action='store_true', help='Also store unfiltered values')
+    args = parser.parse_args()
+
+    run(port=args.port, source=args.source, interval=args.interval, pm_port=args.pm_port,
+        co2_port=args.co2_port, filter_preset=args.filter, store_raw=args.store_raw,
+        adaptive=args.adaptive, max_interval=args.max_interval, scenario=args.scenario,
+        workers=args.workers, rate_limit=args.rate_limit, burst=args.burst,
+        profile_name=args.profile, rss_limit_mb=args.rss_limit)
 
 
 if __name__ == '__main__':
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
-    run(port)
+    main()
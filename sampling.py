@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Adaptive sampling for AirIQ
+Samples quickly while the air is changing or near an AQI boundary, and
+backs off to a sparse duty cycle when it is stable. Long gaps put the
+PMS5003 to sleep, which saves fan and laser wear as well as CPU time and
+SD card writes.
+"""
+
+import time
+
+from air_quality import AQI_BOUNDARIES
+
+# Per channel (absolute, relative) change between consecutive samples that
+# counts as "changing": the larger of the two applies
+THRESHOLDS = {
+    'pm25': (2.0, 0.15),
+    'pm10': (4.0, 0.15),
+    'co2': (50.0, 0.05),
+}
+
+
+class AdaptiveScheduler:
+    """Chooses the time until the next sample from the samples seen so far"""
+
+    def __init__(self, min_interval=2, max_interval=120, thresholds=None, boundaries=AQI_BOUNDARIES,
+                 margin=0.1, boundary_interval=30, calm_samples=3, growth=2.0, min_sleep=30):
+        """
+        Args:
+            min_interval: Seconds between samples while values change
+            max_interval: Longest gap between samples when the air is stable
+            thresholds: Dict of channel -> (absolute, relative) change that
+                        resets to min_interval (default: THRESHOLDS)
+            boundaries: PM2.5 level boundaries; crossing one resets to min_interval
+            margin: Fraction of a boundary counted as "near" it
+            boundary_interval: Longest gap while PM2.5 is near a boundary
+            calm_samples: Unchanged samples before the interval grows
+            growth: Factor the interval grows by after calm_samples
+            min_sleep: Shortest sensor sleep worth a wake-up cycle, in seconds
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.thresholds = THRESHOLDS if thresholds is None else thresholds
+        self.boundaries = boundaries
+        self.margin = margin
+        self.boundary_interval = boundary_interval
+        self.calm_samples = calm_samples
+        self.growth = growth
+        self.min_sleep = min_sleep
+
+        self.interval = min_interval
+        self.reason = 'start'
+        self.samples = 0
+        self.sleeps = 0
+        self.elapsed = 0.0
+        self.slept = 0.0
+        self._last = {}
+        self._calm = 0
+        self._prev_pm25 = None
+        self._gap = None
+
+    def _level(self, pm25):
+        """Index of the AQI level pm25 falls in"""
+        return sum(1 for b in self.boundaries if pm25 > b)
+
+    def update(self, sample):
+        """
+        Take one raw sample into account
+
+        Args:
+            sample: Dict of channel values (None values are ignored)
+
+        Returns:
+            float: Seconds until the next sample
+        """
+        self.samples += 1
+        reason = None
+        for ch, (absolute, relative) in self.thresholds.items():
+            value = sample.get(ch)
+            if value is None:
+                continue
+            last = self._last.get(ch)
+            if last is not None and abs(value - last) > max(absolute, relative * abs(last)):
+                reason = reason or f'{ch} changing'
+            if ch == 'pm25' and last is not None and self._level(value) != self._level(last):
+                reason = 'AQI level changed'
+            self._last[ch] = value
+
+        if reason:
+            self.interval = self.min_interval
+            self.reason = reason
+            self._calm = 0
+            return self._next(self._last.get('pm25'))
+
+        self._calm += 1
+        if self._calm >= self.calm_samples:
+            self._calm = 0
+            self.interval = min(self.interval * self.growth, self.max_interval)
+            self.reason = 'stable'
+
+        pm25 = self._last.get('pm25')
+        if pm25 is not None and any(abs(pm25 - b) <= self.margin * b for b in self.boundaries):
+            if self.interval > self.boundary_interval:
+                self.interval = self.boundary_interval
+                self.reason = 'near AQI boundary'
+
+        # Sample again before the current trend would carry PM2.5 over a boundary
+        if pm25 is not None and self._prev_pm25 is not None and self._gap:
+            slope = (pm25 - self._prev_pm25) / self._gap
+            ahead = [b for b in self.boundaries if (b - pm25) * slope > 0]
+            if ahead:
+                eta = min(abs(b - pm25) for b in ahead) / abs(slope)
+                if eta < self.interval:
+                    self.interval = max(self.min_interval, eta)
+                    self.reason = 'trending to AQI boundary'
+        return self._next(pm25)
+
+    def _next(self, pm25):
+        """Remember the chosen gap and PM2.5 for the next trend estimate"""
+        self._prev_pm25 = pm25
+        self._gap = self.interval
+        return self.interval
+
+    def failed(self):
+        """A read failed: retry at the fastest rate"""
+        self.interval = self.min_interval
+        self.reason = 'read failed'
+        self._gap = None
+        return self.interval
+
+    def wait(self, source, sleep=time.sleep):
+        """
+        Wait until the next sample is due, sleeping the sensor through long gaps
+
+        The sensor is woken `source.warmup` seconds before the sample so its
+        readings have settled.
+
+        Args:
+            source: Data source with sleep(), wake() and warmup
+            sleep: Delay function, replaceable for simulated time
+        """
+        seconds = self.interval
+        asleep = seconds - source.warmup
+        if asleep >= self.min_sleep:
+            source.sleep()
+            sleep(asleep)
+            source.wake()
+            sleep(source.warmup)
+            self.sleeps += 1
+            self.slept += asleep
+        else:
+            sleep(seconds)
+        self.elapsed += seconds
+
+    def status(self):
+        """Scheduler state for the API"""
+        return {
+            'interval': self.interval,
+            'reason': self.reason,
+            'samples': self.samples,
+            'sleeps': self.sleeps,
+            'sensor_duty': 1 - self.slept / self.elapsed if self.elapsed else 1.0,
+        }
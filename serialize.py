@@ -0,0 +1,290 @@
+"""
+JSON encoding for AirIQ API responses
+Builds payloads straight from database cursor tuples and caches closed hours
+of history as ready-made encoded fragments. Uses orjson when it is installed.
+"""
+import json
+import math
+import threading
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta
+from json.encoder import encode_basestring
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from db import get_history_rows
+
+HISTORY_COLUMNS = ('time', 'pm25', 'pm10')
+FORMATS = ('rows', 'columnar')
+
+
+def dumps(obj):
+    """
+    Encode an object as compact JSON
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _encode_value(value):
+    """Encode a single SQLite value (str, int, float or None) as JSON text"""
+    if value is None:
+        return 'null'
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            return 'null'
+        return float.__repr__(value)
+    return str(value)
+
+
+def _column_tokens(values):
+    """
+    Encode a column as a list of JSON tokens
+
+    Tries the C-level float and string encoders on the whole column first;
+    only columns with mixed types (e.g. NULLs) or non-finite floats fall
+    back to _encode_value.
+    """
+    try:
+        tokens = list(map(float.__repr__, values))
+        # Any NaN or infinity makes the sum non-finite (so may an overflow,
+        # which only costs the slow path)
+        if math.isfinite(sum(values)):
+            return tokens
+    except TypeError:
+        pass
+    try:
+        return list(map(encode_basestring, values))
+    except TypeError:
+        return list(map(_encode_value, values))
+
+
+def _encode_column(values):
+    """Encode a column of values as comma-separated JSON text (no brackets)"""
+    if orjson is not None:
+        return orjson.dumps(list(values))[1:-1].decode('utf-8')
+    # Not json.dumps(): it writes NaN and Infinity, which are not JSON
+    return ','.join(_column_tokens(values))
+
+
+def encode_rows(columns, rows, fmt='rows'):
+    """
+    Encode cursor tuples as JSON without building intermediate dicts
+
+    Args:
+        columns: Column names, in the order of each tuple
+        rows: List of tuples from cursor.fetchall()
+        fmt: 'rows' for [{"col": v, ...}, ...] or
+             'columnar' for {"col": [v, ...], ...}
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    return _assemble(columns, [_fragment(columns, rows, fmt)], fmt)
+
+
+def iter_encode(columns, rows, fmt='rows', chunk_size=2000):
+    """
+    Encode a stream of tuples chunk by chunk
+
+    Rows format is yielded as it is encoded; columnar output needs every
+    row before the first column can be closed, so it is yielded once.
+
+    Args:
+        columns: Column names, in the order of each tuple
+        rows: Iterable of tuples, e.g. db.query()
+        fmt: 'rows' or 'columnar'
+        chunk_size: Rows encoded per chunk
+
+    Yields:
+        bytes: Pieces of one JSON document
+    """
+    rows = iter(rows)
+    if fmt == 'columnar':
+        fragments = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            fragments.append(_fragment(columns, chunk, fmt))
+        yield _assemble(columns, fragments, fmt)
+        return
+
+    yield b'['
+    first = True
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        fragment = _fragment(columns, chunk, fmt).encode('utf-8')
+        yield fragment if first else b',' + fragment
+        first = False
+    yield b']'
+
+
+def _fragment(columns, rows, fmt):
+    """
+    Encode rows as a fragment that can be joined with other fragments
+
+    Returns:
+        For 'rows': comma-separated objects (str)
+        For 'columnar': tuple of comma-separated values, one per column
+    """
+    if fmt == 'columnar':
+        if not rows:
+            return tuple('' for _ in columns)
+        return tuple(_encode_column(col) for col in zip(*rows))
+
+    if not rows:
+        return ''
+    template = '{' + ','.join(f'{encode_basestring(c)}:%s' for c in columns) + '}'
+    tokens = zip(*[_column_tokens(col) for col in zip(*rows)])
+    return ','.join([template % t for t in tokens])
+
+
+def _assemble(columns, fragments, fmt):
+    """Join fragments from _fragment() into a complete JSON document"""
+    if fmt == 'columnar':
+        parts = []
+        for i, c in enumerate(columns):
+            values = ','.join(f[i] for f in fragments if f[i])
+            parts.append(f'{encode_basestring(c)}:[{values}]')
+        return ('{' + ','.join(parts) + '}').encode('utf-8')
+    return ('[' + ','.join(f for f in fragments if f) + ']').encode('utf-8')
+
+
+class HistoryCache:
+    """
+    Caches each closed hour of history as an encoded fragment, so a request
+    for the last 24 hours only has to query and encode the open hour
+    """
+
+    def __init__(self, hours=24, max_bytes=None):
+        """
+        Args:
+            hours: Length of the history window
+            max_bytes: Cap on the encoded size of cached fragments; the least
+                       recently used are dropped first (None = no cap)
+        """
+        self.hours = hours
+        self.max_bytes = max_bytes
+        self.fragments = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _closed_hour(self, hour_start, fmt, keep):
+        """Get the fragment for a closed hour, querying it only once"""
+        key = (hour_start, fmt)
+        with self.lock:
+            fragment = self.fragments.get(key)
+            if fragment is not None:
+                self.fragments.move_to_end(key)
+        if fragment is None:
+            rows = get_history_rows(hour_start, hour_start + timedelta(hours=1))
+            fragment = _fragment(HISTORY_COLUMNS, rows, fmt)
+            self._store(key, fragment, keep)
+        return fragment
+
+    def _store(self, key, fragment, keep=()):
+        """
+        Cache a fragment, evicting the least recently used ones to stay
+        under max_bytes
+
+        Fragments in `keep` (the hours the current request reads) are never
+        evicted for it: a request walks the hours oldest to newest, so
+        evicting its own hours would make every later request miss them in
+        turn. The fragment is left uncached instead.
+        """
+        size = self._size(fragment)
+        with self.lock:
+            if key in self.fragments:
+                return
+            if self.max_bytes is not None:
+                if size > self.max_bytes:
+                    return
+                victims = []
+                free = self.max_bytes - self.size
+                for old in self.fragments:
+                    if free >= size:
+                        break
+                    if old not in keep:
+                        victims.append(old)
+                        free += self._size(self.fragments[old])
+                if free < size:
+                    return
+                for old in victims:
+                    self._drop(old)
+            self.fragments[key] = fragment
+            self.size += size
+
+    @staticmethod
+    def _size(fragment):
+        """Encoded size of a rows (str) or columnar (tuple) fragment"""
+        return len(fragment) if isinstance(fragment, str) else sum(map(len, fragment))
+
+    def _drop(self, key):
+        """Remove one fragment (lock held)"""
+        self.size -= self._size(self.fragments.pop(key))
+
+    def _evict(self, oldest):
+        """Drop fragments that have left the history window"""
+        with self.lock:
+            for key in [k for k in self.fragments if k[0] < oldest]:
+                self._drop(key)
+
+    def clear(self):
+        """Drop all cached fragments"""
+        with self.lock:
+            self.fragments.clear()
+            self.size = 0
+
+    def encode(self, fmt='rows', now=None):
+        """
+        Encode the history window
+
+        Args:
+            fmt: 'rows' or 'columnar'
+            now: End of the window (default: current time)
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        now = now or datetime.now()
+        start = now - timedelta(hours=self.hours)
+        open_hour = now.replace(minute=0, second=0, microsecond=0)
+        first_hour = start.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+        # Partial hour at the start of the window is never cached
+        fragments = [_fragment(HISTORY_COLUMNS, get_history_rows(start, first_hour), fmt)]
+
+        hours = []
+        hour = first_hour
+        while hour < open_hour:
+            hours.append(hour)
+            hour += timedelta(hours=1)
+        keep = {(hour, fmt) for hour in hours}
+        fragments.extend(self._closed_hour(hour, fmt, keep) for hour in hours)
+
+        fragments.append(_fragment(HISTORY_COLUMNS, get_history_rows(open_hour), fmt))
+        self._evict(first_hour)
+
+        if fmt == 'columnar':
+            empty = not any(any(f) for f in fragments)
+        else:
+            empty = not any(fragments)
+
+        # If no data, return placeholder with current time (as get_history_24h does)
+        if empty:
+            rows = [((now - timedelta(hours=i)).strftime('%H:%M'), 0, 0) for i in range(24)][::-1]
+            return encode_rows(HISTORY_COLUMNS, rows, fmt)
+        return _assemble(HISTORY_COLUMNS, fragments, fmt)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+AirIQ Memory Soak Test
+Replays a month of simulated readings through the sampling path (filters,
+storage, alerts) in simulated time while clients keep hitting the API of an
+in-process server, and fails if RSS ever exceeds the ceiling
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import db
+import run_server
+from filters import create_pipeline
+from memory import rss_kb
+from sources import SimulatedSource
+
+ENDPOINTS = [
+    '/api/data',
+    '/api/status',
+    '/api/alerts',
+    '/api/history',
+    '/api/history?format=columnar',
+    '/api/history?from=-30d&step=1h&format=columnar',
+    '/api/db/all',
+    '/api/db/all?format=columnar',
+    '/api/export?format=csv',
+    '/api/export?format=parquet',
+    '/api/export?format=arrow',
+]
+
+
+class Clock:
+    """Simulated time: sleep() advances it instantly"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def client(port, stop, counts, lock):
+    """Fetch every endpoint in turn until stopped, discarding the bodies"""
+    while not stop.is_set():
+        for path in ENDPOINTS:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                conn.request('GET', path)
+                resp = conn.getresponse()
+                while resp.read(65536):
+                    pass
+                status = resp.status
+                conn.close()
+            except OSError:
+                status = 0
+            with lock:
+                counts[status] = counts.get(status, 0) + 1
+
+
+def main():
+    """Run the soak test from the command line"""
+    parser = argparse.ArgumentParser(description='Replay a month of readings and watch RSS')
+    parser.add_argument('--days', type=float, default=30, help='Simulated days (default: 30)')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between readings (default: 30)')
+    parser.add_argument('--profile', choices=sorted(run_server.PROFILES), default='low-memory')
+    parser.add_argument('--limit', type=int, default=None,
+                        help="RSS ceiling in MB (default: the profile's, or 64)")
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent API clients')
+    args = parser.parse_args()
+
+    limit = args.limit or run_server.PROFILES[args.profile]['rss_limit_mb'] or 64
+
+    tmpdir = tempfile.mkdtemp()
+    db.DB_PATH = os.path.join(tmpdir, 'soak.db')
+    db.init_db()
+
+    caps = run_server.apply_profile(args.profile, rate_limit=0, rss_limit_mb=limit)
+    server = run_server.DashboardServer(('127.0.0.1', 0), run_server.DashboardHandler, caps['workers'])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    counts = {}
+    lock = threading.Lock()
+    for _ in range(args.clients):
+        threading.Thread(target=client, args=(server.server_address[1], stop, counts, lock),
+                         daemon=True).start()
+
+    start = time.time() - args.days * 86400
+    clock = Clock(start)
+    source = SimulatedSource('daily', clock=clock.time)
+    pipeline = create_pipeline('hampel')
+
+    print(f"\nReplaying {args.days:g} days every {args.interval:g}s, profile {args.profile}, "
+          f"ceiling {limit} MB, {args.clients} clients")
+    print(f"{'DAY':>4} {'ROWS':>9} {'RSS MB':>8} {'PEAK MB':>8} {'SHEDS':>6}")
+    began = time.perf_counter()
+    rows = 0
+    peak = 0
+    day = 0
+    while clock.now < start + args.days * 86400:
+        raw = source.read()
+        data = pipeline.process(raw)
+        db.insert_reading(data['pm1'], data['pm25'], data['pm10'], data['co2'],
+                          timestamp=datetime.fromtimestamp(clock.now))
+        run_server.alert_engine.process(data, clock.now)
+        with run_server.sensor_lock:
+            run_server.sensor_data.update(data)
+        rows += 1
+        if rows % 200 == 0:
+            peak = max(peak, rss_kb())
+        clock.sleep(args.interval)
+        if clock.now >= start + (day + 1) * 86400:
+            day += 1
+            rss = rss_kb()
+            peak = max(peak, rss)
+            print(f"{day:>4} {rows:>9} {rss / 1024:>8.1f} {peak / 1024:>8.1f} {run_server.watchdog.sheds:>6}")
+
+    stop.set()
+    elapsed = time.perf_counter() - began
+    served = ', '.join(f"{status or 'failed'}: {n}" for status, n in sorted(counts.items()))
+    print(f"\n{rows} readings in {elapsed:.0f}s; requests {served}")
+    print(f"Watchdog: {run_server.watchdog.sheds} sheds, critical at the end: {run_server.watchdog.critical}, "
+          f"pyarrow loaded: {'pyarrow' in sys.modules}")
+    print(f"Peak RSS {peak / 1024:.1f} MB, ceiling {limit} MB: {'PASS' if peak <= limit * 1024 else 'FAIL'}\n")
+    server.server_close()
+    sys.exit(0 if peak <= limit * 1024 else 1)
+
+
+if __name__ == '__main__':
+    main()
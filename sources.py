@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Data sources for the AirIQ dashboard server
+Each source yields readings in the same shape, so the server does not care
+whether values come from real sensors or from the simulator
+"""
+
+import math
+import random
+import time
+
+
+def daily_scenario(t):
+    """
+    Synthetic day of indoor air: quiet nights, a slow daytime drift, CO2
+    while the room is occupied, and cooking smoke at 07:30 and 18:30
+
+    Args:
+        t: Unix time
+
+    Returns:
+        dict: pm1, pm25, pm10 and co2 values
+    """
+    lt = time.localtime(t)
+    hour = lt.tm_hour + lt.tm_min / 60 + lt.tm_sec / 3600
+    pm25 = 6 + 3 * math.sin((hour - 9) / 24 * 2 * math.pi)
+    for start, length, peak in ((7.5, 0.3, 45), (18.5, 0.75, 90)):
+        if start <= hour < start + length + 2:
+            rise = min(1.0, (hour - start) / 0.1)
+            decay = math.exp(-max(0.0, hour - start - length) / 0.3)
+            pm25 += peak * rise * decay
+    pm25 = max(0.0, pm25 + random.gauss(0, 0.4))
+    occupied = max(0.0, math.sin((hour - 6) / 16 * math.pi)) if 6 <= hour < 22 else 0.0
+    return {
+        'pm1': pm25 * 0.65,
+        'pm25': pm25,
+        'pm10': pm25 * 1.3 + abs(random.gauss(0, 0.5)),
+        'co2': 450 + 450 * occupied + random.gauss(0, 5),
+    }
+
+
+SCENARIOS = {'noise': None, 'daily': daily_scenario}
+
+
+class SimulatedSource:
+    """Generates mock readings with realistic ranges (no hardware needed)"""
+
+    name = 'simulator'
+
+    # Pretend to need the same fan warm-up as a PMS5003, so power
+    # management behaves as it would on the device
+    warmup = 30
+
+    def __init__(self, scenario='noise', clock=time.time):
+        """
+        Args:
+            scenario: Name from SCENARIOS; 'noise' is uniform random values,
+                      'daily' follows daily_scenario()
+            clock: Time function, replaceable for simulated time
+        """
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {scenario}")
+        self.scenario = SCENARIOS[scenario]
+        self.clock = clock
+
+    def connect(self):
+        """Nothing to open for the simulator"""
+        return True
+
+    def disconnect(self):
+        """Nothing to close for the simulator"""
+        pass
+
+    def sleep(self):
+        """Nothing to power down for the simulator"""
+        pass
+
+    def wake(self):
+        """Nothing to power up for the simulator"""
+        pass
+
+    def read(self):
+        """
+        Generate one simulated reading
+
+        Returns:
+            dict: Dictionary containing PM values and timestamp
+        """
+        now = self.clock()
+        if self.scenario:
+            data = self.scenario(now)
+        else:
+            data = {
+                'pm1': 2.5 + random.uniform(-0.5, 1.0),
+                'pm25': 10 + random.uniform(-2, 5),
+                'pm10': 16 + random.uniform(-3, 8),
+                'co2': None,
+            }
+        data['timestamp'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+        return data
+
+
+class SensorSource:
+    """Reads a PMS5003 and, optionally, an MH-Z19C on a second serial port"""
+
+    name = 'sensor'
+
+    def __init__(self, pm_port='/dev/ttyS0', co2_port=None, baudrate=9600, passive=False):
+        """
+        Initialize sensor source
+
+        Args:
+            pm_port: Serial port of the PMS5003
+            co2_port: Serial port of the MH-Z19C (None = no CO2 sensor)
+            baudrate: Communication speed for both sensors
+            passive: Put the PMS5003 in passive mode, so every read gets a
+                     fresh frame rather than one buffered during warm-up
+        """
+        # Imported here so the simulator works without pyserial installed
+        from pms5003_reader import PMS5003
+
+        self.pms = PMS5003(port=pm_port, baudrate=baudrate)
+        self.warmup = PMS5003.WAKE_UP_TIME
+        self.passive = passive
+        self.mhz = None
+        if co2_port:
+            from mhz19c_reader import MHZ19C
+            self.mhz = MHZ19C(port=co2_port, baudrate=baudrate)
+
+    def connect(self):
+        """Open serial connections; a missing CO2 sensor is not fatal"""
+        if not self.pms.connect():
+            return False
+        if self.passive:
+            self.pms.set_passive(True)
+        if self.mhz and not self.mhz.connect():
+            print("CO2 sensor unavailable, continuing with PM only")
+            self.mhz = None
+        return True
+
+    def disconnect(self):
+        """Close serial connections"""
+        self.pms.disconnect()
+        if self.mhz:
+            self.mhz.disconnect()
+
+    def sleep(self):
+        """Stop the PMS5003 fan and laser (the MH-Z19C has no sleep mode)"""
+        self.pms.sleep()
+
+    def wake(self):
+        """Restart the PMS5003; readings settle after `warmup` seconds"""
+        self.pms.wake()
+
+    def read(self):
+        """
+        Read one sample from the sensors
+
+        Returns:
+            dict: Dictionary containing PM (atmospheric) and CO2 values,
+                  or None if the PM read fails
+        """
+        data = self.pms.read_data()
+        if not data:
+            return None
+
+        co2 = None
+        if self.mhz:
+            co2_data = self.mhz.read_co2()
+            if co2_data:
+                co2 = co2_data['co2']
+
+        return {
+            'pm1': data['pm1_atm'],
+            'pm25': data['pm25_atm'],
+            'pm10': data['pm10_atm'],
+            'co2': co2,
+            'timestamp': data['timestamp']
+        }
+
+
+def create_source(kind, **kwargs):
+    """
+    Build a data source by name
+
+    Args:
+        kind: 'sensor' or 'simulator'
+        **kwargs: Passed to the source constructor
+
+    Returns:
+        Source instance
+    """
+    if kind == 'sensor':
+        return SensorSource(**kwargs)
+    if kind == 'simulator':
+        return SimulatedSource(**kwargs)
+    raise ValueError(f"Unknown data source: {kind}")
@@ -0,0 +1,83 @@
+from alerts import AlertEngine, FlatlineRule, NowCastRule, RateOfChangeRule, ThresholdRule
+
+
+def feed(rule, samples):
+    """Feed (t, value) pairs, returning the transition events"""
+    return [e for e in (rule.update(t, v) for t, v in samples) if e]
+
+
+def test_rate_rule_clears_with_sparse_samples():
+    rule = RateOfChangeRule('spike', 'pm25', rate=10, window=60)
+    events = feed(rule, [(0, 5), (30, 5), (60, 80)])
+    assert [e['state'] for e in events] == ['raised']
+
+    # Adaptive sampling: flat readings 300 s apart, more than the window
+    events = feed(rule, [(360, 80), (660, 80)])
+    assert [e['state'] for e in events] == ['cleared']
+    assert rule.value == 0
+
+
+def test_rate_rule_raises_across_a_sparse_gap():
+    rule = RateOfChangeRule('spike', 'pm25', rate=10, window=60)
+    # +100 over 120 s is 50 per minute, even though the window holds one sample
+    events = feed(rule, [(0, 5), (120, 105)])
+    assert [e['state'] for e in events] == ['raised']
+
+
+def test_flatline_rule_clears_when_too_sparse_to_judge():
+    rule = FlatlineRule('stuck', 'pm25', window=600, min_samples=20)
+    events = feed(rule, [(t, 7.0) for t in range(0, 1200, 10)])
+    assert [e['state'] for e in events] == ['raised']
+
+    events = feed(rule, [(t, 7.0) for t in range(1500, 4000, 300)])
+    assert [e['state'] for e in events] == ['cleared']
+
+
+def test_threshold_rule_needs_the_whole_window_above():
+    rule = ThresholdRule('high', 'pm25', raise_above=35, window=300)
+    assert feed(rule, [(0, 40), (200, 40), (250, 30), (260, 40), (500, 40)]) == []
+    events = feed(rule, [(560, 40)])
+    assert [e['state'] for e in events] == ['raised']
+
+
+def test_threshold_rule_hysteresis_band_keeps_state():
+    rule = ThresholdRule('high', 'pm25', raise_above=35, clear_below=30, window=0)
+    feed(rule, [(0, 40)])
+    # Between clear_below and raise_above: no change
+    assert feed(rule, [(10, 32), (20, 34), (30, 31)]) == []
+    assert rule.active
+    events = feed(rule, [(40, 29)])
+    assert [e['state'] for e in events] == ['cleared']
+
+
+def test_debounce_needs_consecutive_samples():
+    rule = ThresholdRule('high', 'pm25', raise_above=35, window=0, debounce=3)
+    # A sample in the band resets the streak
+    assert feed(rule, [(0, 40), (1, 40), (2, 35), (3, 40), (4, 40)]) == []
+    events = feed(rule, [(5, 40)])
+    assert [(e['state'], e['time']) for e in events] == [('raised', 5)]
+
+
+def test_flatline_ignores_steady_clean_air():
+    rule = FlatlineRule('stuck', 'pm25', window=600, min_samples=20, min_level=5)
+    assert feed(rule, [(t, 1.0) for t in range(0, 1800, 10)]) == []
+    events = feed(rule, [(t, 12.0) for t in range(1800, 3000, 10)])
+    assert [e['state'] for e in events] == ['raised']
+
+
+def test_default_pm25_stuck_rule_ignores_zero_readings():
+    engine = AlertEngine()
+    for t in range(0, 3600, 2):
+        engine.process({'pm25': 0.0, 'pm10': 0.0}, t)
+    assert 'pm25_stuck' not in engine.active()
+
+
+def test_nowcast_weights_recent_hours():
+    rule = NowCastRule('nowcast', 'co2', raise_above=1000)
+    for hour in range(11):
+        feed(rule, [(hour * 3600 + s, 500) for s in range(0, 3600, 600)])
+    events = feed(rule, [(11 * 3600 + s, 2000) for s in range(0, 3600, 600)])
+    # A plain 12 hour mean would be 625; the weight factor of 0.5 lifts it
+    # over the threshold as soon as the new hour starts
+    assert [e['state'] for e in events] == ['raised']
+    assert rule.value > 1000
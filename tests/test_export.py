@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import db
+
+
+def test_epoch_us_timestamps_are_exact(scratch_db):
+    times = [datetime(2025, 11, 3, 1, 8, 42, 463123), datetime(2025, 11, 3, 1, 8, 43),
+             datetime(2025, 11, 3, 23, 59, 59, 999999), datetime(2025, 11, 4, 0, 0, 0, 1)]
+    for t in times:
+        db.insert_reading(1.0, 2.0, 3.0, timestamp=t)
+
+    rows = [row for chunk in db.iter_readings(channels=('pm25',), epoch_us=True) for row in chunk]
+    assert [r[0] for r in rows] == [(t - db.EPOCH) // db.timedelta(microseconds=1) for t in times]
+
+
+def test_csv_values_round_trip(scratch_db):
+    values = (12.629608849835014, 0.1, 1 / 3)
+    db.insert_reading(*values, co2=None, timestamp=datetime(2025, 11, 3))
+
+    lines = [row[0] for chunk in db.iter_readings(channels=('pm1', 'pm25', 'pm10', 'co2'), csv_lines=True)
+             for row in chunk]
+    fields = lines[0].rstrip('\n').split(',')
+    assert tuple(float(v) for v in fields[1:4]) == values
+    assert fields[4] == ''
@@ -0,0 +1,67 @@
+import random
+import statistics
+
+import pytest
+
+from filters import EMA, Hampel, RollingMedian, create_pipeline
+
+
+def test_rolling_median_matches_statistics_median():
+    rng = random.Random(3)
+    values = [rng.choice([rng.uniform(0, 50), 7.0]) for _ in range(500)]  # with duplicates
+    f = RollingMedian(5)
+    for i, v in enumerate(values):
+        assert f.update(v) == statistics.median(values[max(0, i - 4):i + 1])
+
+
+def test_rolling_median_window_is_bounded():
+    f = RollingMedian(5)
+    for v in range(1000):
+        f.update(v)
+    assert len(f._values) == len(f._sorted) == 5
+    assert f._sorted == [995, 996, 997, 998, 999]
+
+
+def test_hampel_replaces_spike_with_median():
+    f = Hampel(7)
+    for v in (10, 11, 10, 12, 11, 10):
+        assert f.update(v) == v
+    assert f.update(500) == 11  # median of the window, spike included
+    assert f.rejected == 1
+
+
+def test_hampel_accepts_level_shift_once_it_fills_half_the_window():
+    f = Hampel(7)
+    for v in (10, 11, 10, 12, 11, 10, 11):
+        f.update(v)
+    out = [f.update(v) for v in (40, 41, 40, 41, 40)]
+    # Rejected while the old level holds the median, then passed through
+    assert out[0] != 40 and out[-1] == 40
+    # The old values leave the window, so a return to 10 is now the outlier
+    assert f.update(10) != 10
+
+
+def test_hampel_flat_window_does_not_reject_small_changes():
+    f = Hampel(7, min_deviation=1.0)
+    for _ in range(7):
+        f.update(5.0)
+    assert f.update(6.0) == 6.0
+    assert f.update(9.0) == 5.0
+
+
+def test_ema():
+    f = EMA(0.5)
+    assert [f.update(v) for v in (10, 20, 20)] == [10, 15, 17.5]
+
+
+def test_pipeline_keeps_state_per_channel_and_skips_missing_values():
+    pipeline = create_pipeline('median', channels=('pm25', 'co2'))
+    for v in (1, 2, 3):
+        out = pipeline.process({'pm25': v, 'co2': 1000 + v, 'pm10': None})
+    assert out == {'pm25': 2, 'co2': 1002, 'pm10': None}
+    assert pipeline.process({'pm25': None})['pm25'] is None
+
+
+def test_unknown_preset():
+    with pytest.raises(ValueError):
+        create_pipeline('kalman')
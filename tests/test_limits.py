@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from limits import RateLimiter, SingleFlight, TokenBucket
+
+
+def test_single_flight_shares_one_call():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do('key', compute)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flights.do('key', compute)))
+                 for _ in range(5)]
+    for t in followers:
+        t.start()
+    while flights.shared < 5:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader] + followers:
+        t.join()
+
+    assert calls == [1]
+    assert results == ['result'] * 6
+    # Nothing is cached once the call is over
+    assert flights.do('key', lambda: 'again') == 'again'
+
+
+def test_single_flight_shares_errors():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait()
+        raise RuntimeError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flights.do('key', fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait()
+    threads += [threading.Thread(target=call) for _ in range(3)]
+    for t in threads[1:]:
+        t.start()
+    while flights.shared < 3:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(errors) == 4
+    assert all(e is errors[0] for e in errors)
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated
+    assert [bucket.take(now) for _ in range(3)] == [0, 0, 0]
+    assert bucket.take(now) == pytest.approx(0.5)
+    assert bucket.take(now + 0.5) == 0
+    # Refill never exceeds the burst
+    assert [bucket.take(now + 100) for _ in range(4)][-1] > 0
+
+
+def test_rate_limiter_retry_after_in_whole_seconds():
+    limiter = RateLimiter(rate=0.5, burst=1)
+    assert limiter.check('a') == 0
+    assert limiter.check('a') == 2
+    assert limiter.check('b') == 0
+    assert limiter.limited == 1
+
+
+def test_rate_limiter_forgets_least_recently_seen_client():
+    limiter = RateLimiter(rate=0.001, burst=1, max_clients=2)
+    limiter.check('a')
+    limiter.check('b')
+    limiter.check('a')      # 'a' is now the most recent, and limited
+    limiter.check('c')      # evicts 'b'
+    assert list(limiter._buckets) == ['a', 'c']
+    assert limiter.check('a') > 0
+    assert limiter.check('b') == 0  # a fresh bucket
@@ -0,0 +1,43 @@
+import pytest
+
+import memory
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    """Feed the watchdog RSS readings (kB) instead of reading /proc"""
+    readings = []
+    monkeypatch.setattr(memory, 'rss_kb', lambda pid='self': readings.pop(0))
+    monkeypatch.setattr(memory, 'release', lambda: None)
+    readings.append(0)  # read by __init__
+    return readings
+
+
+def test_baseline_above_soft_is_shed_once(rss):
+    shed = []
+    watchdog = memory.MemoryWatchdog(100, [lambda: shed.append(1)])
+    # Each shed reads RSS twice: before and after
+    rss.extend([85 * 1024, 84 * 1024, 84 * 1024, 86 * 1024])
+    for _ in range(3):
+        watchdog.check()
+    assert len(shed) == 1
+
+    # Growing past the rearm margin sheds again
+    rss.extend([90 * 1024, 84 * 1024])
+    watchdog.check()
+    assert len(shed) == 2
+
+
+def test_critical_clears_only_below_resume(rss):
+    watchdog = memory.MemoryWatchdog(100)
+    rss.extend([101 * 1024, 101 * 1024])
+    watchdog.check()
+    assert watchdog.critical
+
+    rss.extend([95 * 1024])
+    watchdog.check()
+    assert watchdog.critical
+
+    rss.extend([89 * 1024])
+    watchdog.check()
+    assert not watchdog.critical
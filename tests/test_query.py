@@ -0,0 +1,138 @@
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import db
+
+START = datetime(2025, 11, 3, 0, 0, 0)
+HOURS = 6
+
+
+@pytest.fixture
+def readings(scratch_db):
+    """Six hours of irregularly spaced readings, stored through insert_reading()"""
+    rng = random.Random(7)
+    rows = []
+    t = START + timedelta(seconds=3.25)
+    while t < START + timedelta(hours=HOURS):
+        values = (rng.uniform(0, 5), rng.uniform(5, 60), rng.uniform(10, 80), rng.uniform(400, 1200))
+        db.insert_reading(*values, raw=values, timestamp=t)
+        rows.append((t,) + values)
+        t += timedelta(seconds=rng.uniform(5, 90))
+    return rows
+
+
+def group(rows, step, column, agg):
+    """Reference GROUP BY in Python: {bucket start text: value}"""
+    buckets = {}
+    for row in rows:
+        seconds = (row[0] - db.EPOCH).total_seconds()
+        key = (db.EPOCH + timedelta(seconds=seconds // step * step)).strftime('%Y-%m-%d %H:%M:%S')
+        buckets.setdefault(key, []).append(row[column])
+    reduce = {'avg': lambda v: sum(v) / len(v), 'min': min, 'max': max, 'count': len}[agg]
+    return {k: reduce(v) for k, v in buckets.items()}
+
+
+@pytest.mark.parametrize('agg', db.AGGREGATES)
+@pytest.mark.parametrize('step', [60, 900, 3600])
+def test_rollup_matches_raw_group_by(readings, step, agg):
+    end = START + timedelta(hours=HOURS)
+    plan = db.plan_query(START, end, ('pm25', 'co2'), step, agg)
+    assert plan['source'] == 'rollup'
+
+    result = list(db.query(START, end, ('pm25', 'co2'), plan=plan))
+    pm25 = group(readings, step, 2, agg)
+    co2 = group(readings, step, 4, agg)
+    assert [r[0] for r in result] == sorted(pm25)
+    for t, p, c in result:
+        assert p == pytest.approx(pm25[t])
+        assert c == pytest.approx(co2[t])
+
+
+def test_step_no_rollup_divides_falls_back_to_raw(readings):
+    end = START + timedelta(hours=HOURS)
+    plan = db.plan_query(START, end, ('pm25',), 90, 'avg')
+    assert plan['source'] == 'raw'
+    assert plan['step'] == 90
+
+    result = list(db.query(START, end, ('pm25',), plan=plan))
+    expected = group(readings, 90, 2, 'avg')
+    assert {t: v for t, v in result} == pytest.approx(expected)
+
+
+def test_step_uses_coarsest_dividing_rollup():
+    end = START + timedelta(days=2)
+    assert db.plan_query(START, end, step=7200)['resolution'] == 3600
+    assert db.plan_query(START, end, step=300)['resolution'] == 60
+    assert db.plan_query(START, end, step=2 * 86400)['resolution'] == 86400
+
+
+def test_raw_channel_forces_raw_source(readings):
+    end = START + timedelta(hours=HOURS)
+    plan = db.plan_query(START, end, ('pm25_raw',), 3600, 'avg')
+    assert plan['source'] == 'raw'
+
+    result = list(db.query(START, end, ('pm25_raw',), plan=plan))
+    expected = group(readings, 3600, 2, 'avg')
+    assert {t: v for t, v in result} == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('step', [0, 60])
+def test_row_budget_raises_before_first_row(readings, step):
+    rows = db.query(START, START + timedelta(hours=HOURS), ('pm25',), step=step, max_rows=5)
+    with pytest.raises(db.QueryError, match='limit 5'):
+        next(rows)
+
+
+def test_rebuild_rollups_matches_incremental(readings):
+    conn = sqlite3.connect(db.DB_PATH)
+    incremental = conn.execute('SELECT * FROM rollups ORDER BY resolution, bucket').fetchall()
+
+    # Simulate a database from before rollups existed: init_db() rebuilds them
+    conn.execute('DELETE FROM rollups')
+    conn.commit()
+    db.init_db()
+    rebuilt = conn.execute('SELECT * FROM rollups ORDER BY resolution, bucket').fetchall()
+    conn.close()
+
+    assert len(rebuilt) == len(incremental)
+    for a, b in zip(rebuilt, incremental):
+        assert a == pytest.approx(b)
+
+
+def test_time_budget_ignores_time_spent_by_the_consumer(scratch_db):
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.executemany('INSERT INTO readings (timestamp, pm25) VALUES (?, ?)',
+                     [(START + timedelta(seconds=i), i) for i in range(5000)])
+    conn.commit()
+    conn.close()
+
+    # A slow client: 0.1 s to send every 1000 rows, 0.5 s in all
+    rows = db.query(START, START + timedelta(hours=2), ('pm25',), step=0, time_budget=0.3)
+    count = 0
+    for count, _ in enumerate(rows, 1):
+        if count % 1000 == 0:
+            time.sleep(0.1)
+    assert count == 5000
+
+
+def test_parse_time_converts_offsets_to_local_time():
+    parsed = db.parse_time('2025-11-01T00:00:00Z')
+    assert parsed.tzinfo is None
+    assert parsed == datetime(2025, 11, 1, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    # Usable in a plan alongside naive times
+    assert db.plan_query(parsed, datetime(2025, 11, 2))['source'] == 'rollup'
+
+
+@pytest.mark.parametrize('value', ['-99999999999d', '-9999999999999999999999y', '2025-13-01', 'soon'])
+def test_parse_time_rejects_invalid_and_overflowing_times(value):
+    with pytest.raises(db.QueryError):
+        db.parse_time(value)
+
+
+def test_parse_duration_rejects_overflowing_steps():
+    with pytest.raises(db.QueryError, match='too long'):
+        db.parse_duration('99999999999999999999')
@@ -0,0 +1,30 @@
+from sampling import AdaptiveScheduler
+
+
+def settle(scheduler, pm25, samples=12):
+    """Feed a constant reading until the interval has grown"""
+    for _ in range(samples):
+        scheduler.update({'pm25': pm25})
+    return scheduler.interval
+
+
+def test_stable_air_backs_off_to_max_interval():
+    scheduler = AdaptiveScheduler(max_interval=300)
+    assert settle(scheduler, 5.0, 30) == 300
+
+
+def test_trend_toward_boundary_cuts_gap_short():
+    scheduler = AdaptiveScheduler(max_interval=300, margin=0.02)  # 34 is not "near" 35
+    gap = settle(scheduler, 30.0, 30)
+    # +4 µg/m³ is below the 15% change threshold, but at that rate PM2.5
+    # crosses 35 in about a quarter of the gap
+    assert scheduler.update({'pm25': 34.0}) < gap
+    assert scheduler.reason == 'trending to AQI boundary'
+    assert scheduler.interval == (35 - 34.0) / (4.0 / gap)
+
+
+def test_trend_away_from_boundary_keeps_gap():
+    scheduler = AdaptiveScheduler(max_interval=300)
+    settle(scheduler, 34.0, 30)
+    scheduler.update({'pm25': 30.0})
+    assert scheduler.reason != 'trending to AQI boundary'
@@ -0,0 +1,106 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import db
+import serialize
+
+NOW = datetime(2025, 11, 3, 12, 30)
+
+
+@pytest.fixture
+def day(scratch_db):
+    """24 hours of 2 s readings up to NOW"""
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.executemany('INSERT INTO readings (timestamp, pm1, pm25, pm10, co2) VALUES (?, ?, ?, ?, ?)',
+                     [(NOW - timedelta(seconds=2 * i), 1.25, 12.629608849835014, i % 97 / 3, 400.0)
+                      for i in range(43200)])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Count the history queries HistoryCache makes"""
+    calls = []
+    query = serialize.get_history_rows
+    monkeypatch.setattr(serialize, 'get_history_rows', lambda *a: calls.append(a) or query(*a))
+    return calls
+
+
+@pytest.mark.parametrize('fmt', serialize.FORMATS)
+def test_history_cache_matches_direct_query(day, fmt):
+    cache = serialize.HistoryCache()
+    expected = serialize.encode_rows(serialize.HISTORY_COLUMNS,
+                                     db.get_history_rows(NOW - timedelta(hours=24)), fmt)
+    assert json.loads(cache.encode(fmt, NOW)) == json.loads(expected)
+    # Served from cached hours the second time
+    assert json.loads(cache.encode(fmt, NOW)) == json.loads(expected)
+
+
+def test_history_cache_queries_closed_hours_once(day, queries):
+    cache = serialize.HistoryCache()
+    cache.encode('rows', NOW)
+    assert len(queries) == 25
+    del queries[:]
+    cache.encode('rows', NOW)
+    assert len(queries) == 2  # the partial first hour and the open hour
+
+
+def test_capped_history_cache_does_not_thrash(day, queries):
+    cache = serialize.HistoryCache(max_bytes=2 * 1024 * 1024)
+    for fmt in ('rows', 'columnar', 'columnar'):
+        del queries[:]
+        cache.encode(fmt, NOW)
+    assert len(queries) == 2
+    assert cache.size <= cache.max_bytes
+
+    # Rows fragments are bigger: not every hour fits, but the same ones stay
+    counts = []
+    for _ in range(3):
+        del queries[:]
+        cache.encode('rows', NOW)
+        counts.append(len(queries))
+    assert counts[1] == counts[2] < 25
+
+
+ROWS = [('00:00', 12.5, 20), ('00:02', None, 21), ('a "quoted"\\ é', float('nan'), -3),
+        ('00:06', 1e-7, 10 ** 12)]
+
+
+def reference(columns, rows, fmt):
+    """Expected document, built with the json module (NaN becomes null)"""
+    clean = [tuple(None if v != v else v for v in row) for row in rows]
+    if fmt == 'columnar':
+        return {c: list(col) for c, col in zip(columns, zip(*clean))} if clean else {c: [] for c in columns}
+    return [dict(zip(columns, row)) for row in clean]
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    """Run a test with orjson (when installed) and with the json fallback"""
+    if request.param == 'json':
+        monkeypatch.setattr(serialize, 'orjson', None)
+    elif serialize.orjson is None:
+        pytest.skip('orjson is not installed')
+
+
+@pytest.mark.parametrize('fmt', serialize.FORMATS)
+@pytest.mark.parametrize('rows', [ROWS, ROWS[:1], []])
+def test_encode_rows_matches_json(encoder, rows, fmt):
+    columns = ('time', 'pm25', 'pm10')
+    assert json.loads(serialize.encode_rows(columns, rows, fmt)) == reference(columns, rows, fmt)
+
+
+@pytest.mark.parametrize('fmt', serialize.FORMATS)
+def test_iter_encode_matches_encode_rows(encoder, fmt):
+    columns = ('time', 'pm25', 'pm10')
+    rows = ROWS * 5
+    streamed = b''.join(serialize.iter_encode(columns, iter(rows), fmt, chunk_size=3))
+    assert json.loads(streamed) == json.loads(serialize.encode_rows(columns, rows, fmt))
+
+
+def test_dumps_is_compact(encoder):
+    assert serialize.dumps({'a': [1, None, 'x']}) == b'{"a":[1,null,"x"]}'
@@ -1,59 +1,246 @@
 #!/usr/bin/env python3
-"""View AirIQ database contents"""
-import sqlite3
+"""
+View AirIQ database contents
+
+Usage:
+    python3 view_db.py [N]                    latest N readings (default 20)
+    python3 view_db.py follow                 print new readings as they arrive
+    python3 view_db.py stats [--from --to]    per-channel statistics from rollups
+    python3 view_db.py hist [channel]         histogram and percentiles
+    python3 view_db.py check                  integrity checks
+    python3 view_db.py explain                query plans and runtimes of the hot queries
+
+Every command reports its runtime against a budget (--budget, milliseconds)
+and exits non-zero when it is exceeded, so it can be scripted on the device.
+"""
+import argparse
 import sys
+import time
+
+import db
+
+# Default runtime budget per command in milliseconds. check scans every row,
+# so it gets far more room than the indexed lookups.
+BUDGETS = {'latest': 50, 'follow': 50, 'stats': 50, 'hist': 500, 'check': 5000, 'explain': 500}
+
+
+def fmt_value(value, width=8):
+    """Format a reading column, leaving gaps for missing values"""
+    return f"{value:<{width}.2f}" if value is not None else f"{'-':<{width}}"
+
+
+def print_rows(rows):
+    """Print (id, timestamp, pm1, pm25, pm10, co2) rows as a table"""
+    for row in rows:
+        print(f"{row[0]:<7} {str(row[1])[:19]:<20} {fmt_value(row[2])} {fmt_value(row[3])} "
+              f"{fmt_value(row[4])} {fmt_value(row[5])}")
+
+
+def print_header():
+    """Print the table header used by latest and follow"""
+    print(f"\n{'ID':<7} {'TIMESTAMP':<20} {'PM1':<8} {'PM2.5':<8} {'PM10':<8} {'CO2':<8}")
+    print("-" * 64)
 
-DB_PATH = 'airiq.db'
 
 def view_latest(limit=20):
     """View latest readings"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT id, timestamp, pm1, pm25, pm10 FROM readings ORDER BY timestamp DESC LIMIT ?', (limit,))
-    rows = c.fetchall()
-    conn.close()
-    
+    rows = db.get_latest_rows(limit)
+
     if not rows:
         print("No data in database")
         return
-    
-    print(f"\n{'ID':<5} {'TIMESTAMP':<20} {'PM1':<8} {'PM2.5':<8} {'PM10':<8}")
-    print("-" * 60)
-    for row in rows:
-        print(f"{row[0]:<5} {row[1]:<20} {row[2]:<8.2f} {row[3]:<8.2f} {row[4]:<8.2f}")
+
+    print_header()
+    print_rows(rows)
     print()
 
-def stats():
-    """Show database statistics"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute('SELECT COUNT(*) FROM readings')
-    count = c.fetchone()[0]
-    
-    c.execute('SELECT AVG(pm25), MIN(pm25), MAX(pm25) FROM readings')
-    avg_pm25, min_pm25, max_pm25 = c.fetchone()
-    
-    c.execute('SELECT AVG(pm10), MIN(pm10), MAX(pm10) FROM readings')
-    avg_pm10, min_pm10, max_pm10 = c.fetchone()
-    
-    conn.close()
-    
+
+def follow(interval=2.0, backlog=10):
+    """
+    Print new readings as they are inserted, like tail -f
+
+    Args:
+        interval: Seconds between polls
+        backlog: Number of existing readings to show first
+
+    Returns:
+        float: Slowest poll in ms
+    """
+    began = time.perf_counter()
+    rows = db.get_latest_rows(backlog)[::-1]
+    slowest = (time.perf_counter() - began) * 1000
+    polls = 1
+    print_header()
+    print_rows(rows)
+    last_id = rows[-1][0] if rows else 0
+    try:
+        while True:
+            time.sleep(interval)
+            began = time.perf_counter()
+            rows = db.get_rows_after(last_id)
+            slowest = max(slowest, (time.perf_counter() - began) * 1000)
+            polls += 1
+            if rows:
+                print_rows(rows)
+                last_id = rows[-1][0]
+    except KeyboardInterrupt:
+        print(f"\nStopped by user after {polls} polls")
+    return slowest
+
+
+def stats(start=None, end=None):
+    """Show per-channel statistics for the whole history or a time range"""
+    result = db.get_stats(start, end)
+    units = {'pm1': 'µg/m³', 'pm25': 'µg/m³', 'pm10': 'µg/m³', 'co2': 'ppm'}
+    names = {'pm1': 'PM1.0', 'pm25': 'PM2.5', 'pm10': 'PM10', 'co2': 'CO2'}
+
     print("\n=== Database Statistics ===")
-    print(f"Total readings: {count}")
-    print(f"\nPM2.5:")
-    print(f"  Average: {avg_pm25:.2f} µg/m³")
-    print(f"  Min: {min_pm25:.2f} µg/m³")
-    print(f"  Max: {max_pm25:.2f} µg/m³")
-    print(f"\nPM10:")
-    print(f"  Average: {avg_pm10:.2f} µg/m³")
-    print(f"  Min: {min_pm10:.2f} µg/m³")
-    print(f"  Max: {max_pm10:.2f} µg/m³")
+    if result['first'] is None:
+        print("No data in range")
+        print()
+        return
+    print(f"Range: {result['first']} to {result['last']} "
+          f"(from {result['resolution']}s rollups)")
+    for ch, s in result['channels'].items():
+        if not s['count']:
+            continue
+        print(f"\n{names[ch]}: {s['count']} readings")
+        print(f"  Average: {s['avg']:.2f} {units[ch]}")
+        print(f"  Min: {s['min']:.2f} {units[ch]}")
+        print(f"  Max: {s['max']:.2f} {units[ch]}")
     print()
 
-if __name__ == '__main__':
-    if len(sys.argv) > 1 and sys.argv[1] == 'stats':
-        stats()
+
+def percentile(hist, width, p):
+    """
+    Percentile estimated from a histogram, interpolating inside the bin
+
+    Args:
+        hist: (bin_start, count) list from db.get_histogram
+        width: Bin width
+        p: Percentile in 0-100
+    """
+    total = sum(n for _, n in hist)
+    target = total * p / 100
+    seen = 0
+    for start, n in hist:
+        if seen + n >= target:
+            return start + width * (target - seen) / n
+        seen += n
+    return hist[-1][0] + width
+
+
+def histogram(channel='pm25', start=None, end=None, width=1.0, bar_width=40):
+    """Show a text histogram and percentile report for one channel"""
+    hist = db.get_histogram(channel, start, end, width)
+    if not hist:
+        print("No data in range")
+        return
+
+    total = sum(n for _, n in hist)
+    peak = max(n for _, n in hist)
+    print(f"\n=== {channel} histogram ({total} readings, bin width {width:g}) ===")
+    for start_value, n in hist:
+        bar = '#' * max(1, round(n / peak * bar_width))
+        print(f"{start_value:>8.1f} - {start_value + width:<8.1f} {n:>8} {bar}")
+
+    print("\nPercentiles:")
+    for p in (5, 25, 50, 75, 95, 99):
+        print(f"  p{p:<3} {percentile(hist, width, p):.2f}")
+    print()
+
+
+def check():
+    """Run integrity checks; returns True if all passed"""
+    results = db.check_integrity()
+    print()
+    for name, ok, detail in results:
+        label = 'OK  ' if ok else 'WARN' if ok is None else 'FAIL'
+        print(f"{label} {name:<32} {detail}")
+    print()
+    return all(ok is not False for _, ok, _ in results)
+
+
+def explain():
+    """Show EXPLAIN QUERY PLAN output and runtime for the hot queries"""
+    for name, sql, params in db.hot_queries():
+        rows, elapsed = db.time_query(sql, params)
+        print(f"\n{name}: {rows} rows in {elapsed * 1000:.2f} ms")
+        for line in db.explain(sql, params):
+            print(f"  {line}")
+    print()
+
+
+def main():
+    """Parse command line and run one command"""
+    argv = sys.argv[1:]
+    # Keep the old 'view_db.py 50' form working
+    if not argv or argv[0].isdigit():
+        argv = ['latest'] + argv
+
+    parser = argparse.ArgumentParser(description='View AirIQ database contents')
+    parser.add_argument('--budget', type=float, help='Runtime budget in ms (default: per command)')
+    # Also accepted after the command; SUPPRESS keeps a value given before it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--budget', type=float, default=argparse.SUPPRESS,
+                        help='Runtime budget in ms (default: per command)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('latest', help='Latest readings', parents=[common])
+    p.add_argument('limit', nargs='?', type=int, default=20)
+
+    p = sub.add_parser('follow', help='Print new readings as they arrive (budget: slowest poll)',
+                       parents=[common])
+    p.add_argument('--interval', type=float, default=2.0, help='Seconds between polls')
+
+    for name, text in (('stats', 'Statistics from rollups'), ('hist', 'Histogram and percentiles')):
+        p = sub.add_parser(name, help=text, parents=[common])
+        if name == 'hist':
+            p.add_argument('channel', nargs='?', default='pm25')
+            p.add_argument('--width', type=float, default=1.0, help='Bin width')
+        p.add_argument('--from', dest='start', help="Start time ('2025-11-01', or --from=-7d)")
+        p.add_argument('--to', dest='end', help='End time')
+
+    sub.add_parser('check', help='Integrity checks', parents=[common])
+    sub.add_parser('explain', help='Query plans and runtimes of the hot queries', parents=[common])
+
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    elapsed = None
+    ok = True
+    try:
+        if args.command == 'latest':
+            view_latest(args.limit)
+        elif args.command == 'follow':
+            # Runs until Ctrl-C, so its runtime is the slowest poll
+            elapsed = follow(args.interval)
+        elif args.command in ('stats', 'hist'):
+            start = db.parse_time(args.start) if args.start else None
+            end = db.parse_time(args.end) if args.end else None
+            if args.command == 'stats':
+                stats(start, end)
+            else:
+                histogram(args.channel, start, end, args.width)
+        elif args.command == 'check':
+            ok = check()
+        elif args.command == 'explain':
+            explain()
+    except db.QueryError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    label = args.command
+    if elapsed is None:
+        elapsed = (time.perf_counter() - began) * 1000
     else:
-        limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
-        view_latest(limit)
+        label += ' slowest poll'
+    budget = args.budget or BUDGETS[args.command]
+    verdict = 'within' if elapsed <= budget else 'OVER'
+    print(f"[{label}: {elapsed:.1f} ms, {verdict} {budget:g} ms budget]")
+    if not ok or elapsed > budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()